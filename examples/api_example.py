@@ -6,6 +6,10 @@ from pygcs.api_server import APIObject, api_method, client_method, server_method
 from pygcs.networking.server_client import Server, Client
 import time
 import threading
+import signal
+import logging
+
+logger = logging.getLogger("pygcs.examples")
 
 class CalculatorAPI(APIObject):
     """Example API that can work as both client and server"""
@@ -18,14 +22,16 @@ class CalculatorAPI(APIObject):
     def add_numbers(self, a: float, b: float) -> float:
         """Add two numbers - available on both client and server"""
         result = a + b
-        print(f"Adding {a} + {b} = {result}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Adding %s + %s = %s", a, b, result)
         return result
     
     @api_method("multiply")
     def multiply_numbers(self, a: float, b: float) -> float:
         """Multiply two numbers"""
         result = a * b
-        print(f"Multiplying {a} * {b} = {result}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Multiplying %s * %s = %s", a, b, result)
         return result
     
     @api_method("store")
@@ -33,14 +39,16 @@ class CalculatorAPI(APIObject):
     def store_value(self, value: float) -> str:
         """Store a value on the server - server only"""
         self.stored_value = value
-        print(f"Stored value: {value}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Stored value: %s", value)
         return f"Stored {value}"
     
     @api_method("get_stored")
     @server_method
     def get_stored_value(self) -> float:
         """Get stored value - server only"""
-        print(f"Retrieved stored value: {self.stored_value}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retrieved stored value: %s", self.stored_value)
         return self.stored_value
     
     @api_method("ping")
@@ -59,6 +67,10 @@ def run_server():
     # Attach API to server
     server.add_processor(calc_api)
     
+    # Block on an event instead of polling; Ctrl+C sets it
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    
     try:
         # Start server
         success = server.connect()
@@ -70,11 +82,9 @@ def run_server():
         
         # Keep server running
         print("Server running... Press Ctrl+C to stop")
-        while True:
-            time.sleep(1)
-            
-    except KeyboardInterrupt:
+        stop_event.wait()
         print("\n🛑 Stopping server...")
+            
     except Exception as e:
         print(f"❌ Server error: {e}")
     finally:
@@ -195,6 +205,9 @@ def run_multi_api_server():
     server.add_processor(calc_api)
     server.add_processor(string_api)
     
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    
     try:
         success = server.connect()
         if not success:
@@ -205,11 +218,9 @@ def run_multi_api_server():
         print("Available APIs: calculator_api, string_api")
         
         print("Server running... Press Ctrl+C to stop")
-        while True:
-            time.sleep(1)
-            
-    except KeyboardInterrupt:
+        stop_event.wait()
         print("\n🛑 Stopping multi-API server...")
+            
     except Exception as e:
         print(f"❌ Server error: {e}")
     finally:
@@ -3,13 +3,24 @@ Advanced example: Distributed File Manager API
 Demonstrates more complex usage patterns
 """
 
-from pygcs.api_server import APIObject, api_method, server_method
+from pygcs.api_server import APIObject, FileRegion, api_method, server_method
+from pygcs.networking.server_client import Client
 import os
-import json
+import re
+import stat
+import fnmatch
+import msgspec
 import time
+import threading
+import itertools
+from operator import itemgetter
 from pathlib import Path
+from concurrent.futures import Future
 from typing import List, Dict, Optional
 
+# Size of the pieces files are streamed in during replication
+CHUNK_SIZE = 1024 * 1024
+
 class FileManagerAPI(APIObject):
     """Distributed file manager that can run on multiple machines"""
     
@@ -17,40 +28,56 @@ class FileManagerAPI(APIObject):
         super().__init__("file_manager")
         self.base_path = Path(base_path)
         self.base_path.mkdir(exist_ok=True)
+        # Hot methods join onto this string rather than building Path objects
+        self._base_str = str(self.base_path.resolve())
         print(f"FileManager initialized with base path: {self.base_path}")
     
+    def _full_path(self, path: str) -> str:
+        """Resolve a path relative to the base path, refusing anything outside it"""
+        full = os.path.normpath(os.path.join(self._base_str, path))
+        if full != self._base_str and not full.startswith(self._base_str + os.sep):
+            raise PermissionError(f"Path is outside the base path: {path}")
+        return full
+    
     @api_method("list_files")
     def list_files(self, path: str = "") -> List[Dict]:
         """List files in a directory"""
-        full_path = self.base_path / path
+        full_path = self._full_path(path)
         
-        if not full_path.exists():
+        if not os.path.exists(full_path):
             raise FileNotFoundError(f"Path does not exist: {path}")
         
-        if not full_path.is_dir():
+        if not os.path.isdir(full_path):
             raise NotADirectoryError(f"Path is not a directory: {path}")
         
+        # Collect (sort key..., entry) tuples so sorting compares plain
+        # tuples in C instead of calling a key function per entry
         files = []
-        for item in full_path.iterdir():
-            files.append({
-                'name': item.name,
-                'path': str(item.relative_to(self.base_path)),
-                'is_dir': item.is_dir(),
-                'size': item.stat().st_size if item.is_file() else 0,
-                'modified': item.stat().st_mtime
-            })
-        
-        return sorted(files, key=lambda x: (not x['is_dir'], x['name']))
+        with os.scandir(full_path) as entries:
+            for entry in entries:
+                # One stat per entry instead of separate is_dir/is_file/stat calls
+                st = entry.stat()
+                is_dir = stat.S_ISDIR(st.st_mode)
+                files.append((not is_dir, entry.name, {
+                    'name': entry.name,
+                    'path': os.path.relpath(entry.path, self._base_str),
+                    'is_dir': is_dir,
+                    'size': st.st_size if stat.S_ISREG(st.st_mode) else 0,
+                    'modified': st.st_mtime
+                }))
+        
+        files.sort(key=itemgetter(0, 1))
+        return [file for _, _, file in files]
     
     @api_method("read_file")
     def read_file(self, file_path: str) -> str:
         """Read contents of a text file"""
-        full_path = self.base_path / file_path
+        full_path = self._full_path(file_path)
         
-        if not full_path.exists():
+        if not os.path.exists(full_path):
             raise FileNotFoundError(f"File does not exist: {file_path}")
         
-        if not full_path.is_file():
+        if not os.path.isfile(full_path):
             raise IsADirectoryError(f"Path is not a file: {file_path}")
         
         try:
@@ -63,29 +90,77 @@ class FileManagerAPI(APIObject):
     @server_method
     def write_file(self, file_path: str, content: str, create_dirs: bool = True) -> bool:
         """Write content to a file (server only for security)"""
-        full_path = self.base_path / file_path
+        full_path = self._full_path(file_path)
         
         if create_dirs:
-            full_path.parent.mkdir(parents=True, exist_ok=True)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
         
         with open(full_path, 'w', encoding='utf-8') as f:
             f.write(content)
         
         return True
     
+    @api_method("read_file_bytes")
+    def read_file_bytes(self, file_path: str) -> bytes:
+        """Read the raw contents of a file without decoding it"""
+        full_path = self._full_path(file_path)
+        
+        if not os.path.exists(full_path):
+            raise FileNotFoundError(f"File does not exist: {file_path}")
+        
+        if not os.path.isfile(full_path):
+            raise IsADirectoryError(f"Path is not a file: {file_path}")
+        
+        with open(full_path, 'rb') as f:
+            return f.read()
+    
+    @api_method("stream_file")
+    def stream_file(self, file_path: str, offset: int = 0, length: int = CHUNK_SIZE) -> FileRegion:
+        """Send up to length raw bytes of a file starting at offset, using sendfile when possible"""
+        full_path = self._full_path(file_path)
+        
+        if not os.path.isfile(full_path):
+            raise FileNotFoundError(f"File does not exist: {file_path}")
+        
+        return FileRegion(open(full_path, 'rb'), offset, length)
+    
+    @api_method("write_file_chunk")
+    @server_method
+    def write_file_chunk(self, file_path: str, offset: int, data: bytes, final: bool = False,
+                         create_dirs: bool = True) -> bool:
+        """Write raw bytes at offset; the first chunk truncates, the final chunk sets the length"""
+        full_path = self._full_path(file_path)
+        
+        if create_dirs and offset == 0:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        
+        flags = os.O_WRONLY | os.O_CREAT
+        if offset == 0:
+            flags |= os.O_TRUNC
+        
+        fd = os.open(full_path, flags, 0o644)
+        try:
+            os.pwrite(fd, data, offset)
+            if final:
+                os.ftruncate(fd, offset + len(data))
+        finally:
+            os.close(fd)
+        
+        return True
+    
     @api_method("delete_file")
     @server_method
     def delete_file(self, file_path: str) -> bool:
         """Delete a file (server only for security)"""
-        full_path = self.base_path / file_path
+        full_path = self._full_path(file_path)
         
-        if not full_path.exists():
+        if not os.path.exists(full_path):
             raise FileNotFoundError(f"File does not exist: {file_path}")
         
-        if full_path.is_file():
-            full_path.unlink()
-        elif full_path.is_dir():
-            full_path.rmdir()  # Only remove empty directories
+        if os.path.isfile(full_path):
+            os.unlink(full_path)
+        elif os.path.isdir(full_path):
+            os.rmdir(full_path)  # Only remove empty directories
         else:
             raise ValueError(f"Cannot delete: {file_path}")
         
@@ -95,77 +170,134 @@ class FileManagerAPI(APIObject):
     @server_method
     def create_directory(self, dir_path: str) -> bool:
         """Create a directory (server only)"""
-        full_path = self.base_path / dir_path
-        full_path.mkdir(parents=True, exist_ok=True)
+        full_path = self._full_path(dir_path)
+        os.makedirs(full_path, exist_ok=True)
         return True
     
     @api_method("get_file_info")
     def get_file_info(self, file_path: str) -> Dict:
         """Get detailed information about a file"""
-        full_path = self.base_path / file_path
+        full_path = self._full_path(file_path)
         
-        if not full_path.exists():
+        try:
+            st = os.stat(full_path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Path does not exist: {file_path}")
         
-        stat = full_path.stat()
-        
         return {
-            'name': full_path.name,
-            'path': str(full_path.relative_to(self.base_path)),
-            'absolute_path': str(full_path),
-            'is_file': full_path.is_file(),
-            'is_dir': full_path.is_dir(),
-            'size': stat.st_size,
-            'created': stat.st_ctime,
-            'modified': stat.st_mtime,
-            'accessed': stat.st_atime,
-            'permissions': oct(stat.st_mode)[-3:]
+            'name': os.path.basename(full_path),
+            'path': os.path.relpath(full_path, self._base_str),
+            'absolute_path': full_path,
+            'is_file': stat.S_ISREG(st.st_mode),
+            'is_dir': stat.S_ISDIR(st.st_mode),
+            'size': st.st_size,
+            'created': st.st_ctime,
+            'modified': st.st_mtime,
+            'accessed': st.st_atime,
+            'permissions': oct(st.st_mode)[-3:]
         }
     
     @api_method("search_files")
     def search_files(self, pattern: str, path: str = "", recursive: bool = True) -> List[Dict]:
         """Search for files matching a pattern"""
-        full_path = self.base_path / path
+        full_path = self._full_path(path)
         
-        if not full_path.exists():
+        if not os.path.exists(full_path):
             raise FileNotFoundError(f"Path does not exist: {path}")
         
+        # Match names in Python with the same wildcard rules as glob, so
+        # only matching entries ever need a stat call
+        name_matches = re.compile(fnmatch.translate(f"*{pattern}*")).match
         matches = []
+        pending = [full_path]
         
-        if recursive:
-            search_pattern = f"**/*{pattern}*"
-        else:
-            search_pattern = f"*{pattern}*"
-        
-        for match in full_path.glob(search_pattern):
+        while pending:
             try:
-                rel_path = match.relative_to(self.base_path)
-                matches.append({
-                    'name': match.name,
-                    'path': str(rel_path),
-                    'is_dir': match.is_dir(),
-                    'size': match.stat().st_size if match.is_file() else 0
-                })
-            except (OSError, ValueError):
-                # Skip files we can't access
+                entries = os.scandir(pending.pop())
+            except OSError:
+                # Skip directories we can't access
                 continue
+            
+            with entries:
+                for entry in entries:
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    
+                    if not name_matches(entry.name):
+                        continue
+                    
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        # Skip files we can't access
+                        continue
+                    
+                    matches.append({
+                        'name': entry.name,
+                        'path': os.path.relpath(entry.path, self._base_str),
+                        'is_dir': stat.S_ISDIR(st.st_mode),
+                        'size': st.st_size if stat.S_ISREG(st.st_mode) else 0
+                    })
         
         return matches
 
+class FileServerPool:
+    """
+    Pool of connections to a single file server, used round-robin so
+    concurrent calls don't queue behind each other on one socket
+    """
+    
+    def __init__(self, host: str, port: int, size: int = 4):
+        self.host = host
+        self.port = port
+        self._apis: List[FileManagerAPI] = []
+        self._next = itertools.count()
+        
+        for _ in range(size):
+            client = Client(server_host=host, server_port=port)
+            api = FileManagerAPI()
+            client.add_processor(api)
+            
+            if not client.connect():
+                self.disconnect()
+                raise ConnectionError(f"Could not connect to {host}:{port}")
+            
+            self._apis.append(api)
+    
+    def _acquire(self) -> FileManagerAPI:
+        return self._apis[next(self._next) % len(self._apis)]
+    
+    def call_remote(self, method: str, *args, **kwargs):
+        """Call a remote method on the next connection in the pool"""
+        return self._acquire().call_remote(method, *args, **kwargs)
+    
+    def call_remote_async(self, method: str, *args, **kwargs) -> Future:
+        """Call a remote method asynchronously on the next connection in the pool"""
+        return self._acquire().call_remote_async(method, *args, **kwargs)
+    
+    def disconnect(self):
+        """Close every connection in the pool"""
+        for api in self._apis:
+            api.disconnect()
+        self._apis.clear()
+
 class DistributedFileManager:
     """
     Manager that coordinates multiple FileManager instances
     """
     
-    def __init__(self):
-        self.servers = {}  # server_name -> FileManagerAPI client
+    def __init__(self, cache_ttl: float = 0.75):
+        self.servers: Dict[str, FileServerPool] = {}
+        
+        # Short-lived cache of fan-out results, shared by identical requests
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[tuple, tuple] = {}  # key -> (expiry or None while in flight, Future)
+        self._cache_lock = threading.Lock()
     
-    def add_server(self, name: str, host: str, port: int) -> bool:
+    def add_server(self, name: str, host: str, port: int, pool_size: int = 4) -> bool:
         """Add a file server to the distributed system"""
         try:
-            client = FileManagerAPI()
-            client.connect_to_server(host, port)
-            self.servers[name] = client
+            self.servers[name] = FileServerPool(host, port, size=pool_size)
             print(f"✅ Connected to server '{name}' at {host}:{port}")
             return True
         except Exception as e:
@@ -181,60 +313,138 @@ class DistributedFileManager:
     
     def list_all_files(self, path: str = "") -> Dict[str, List]:
         """List files from all connected servers"""
-        all_files = {}
-        
-        for server_name, client in self.servers.items():
-            try:
-                files = client.call_remote("list_files", path, timeout=10.0)
-                all_files[server_name] = files
-            except Exception as e:
-                print(f"❌ Error listing files from {server_name}: {e}")
-                all_files[server_name] = []
-        
-        return all_files
+        return self._call_all("list_files", path, timeout=10.0, action="listing files from")
     
     def search_all_servers(self, pattern: str) -> Dict[str, List]:
         """Search for files across all servers"""
+        return self._call_all("search_files", pattern, "", True, timeout=30.0, action="searching")
+    
+    def _call_all(self, method: str, *args, timeout: float, action: str) -> Dict[str, List]:
+        """Issue the same call to every server, reusing recent or in-flight results"""
+        key = (method, args, frozenset(self.servers))
+        now = time.monotonic()
+        
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None or (entry[0] is not None and entry[0] <= now):
+                pending = Future()
+                self._cache[key] = (None, pending)
+                owner = True
+            else:
+                pending = entry[1]
+                owner = False
+        
+        if not owner:
+            return dict(pending.result())
+        
+        try:
+            results = self._fan_out(method, args, timeout, action)
+        except BaseException as e:
+            with self._cache_lock:
+                if self._cache.get(key, (None, None))[1] is pending:
+                    del self._cache[key]
+            pending.set_exception(e)
+            raise
+        
+        now = time.monotonic()
+        with self._cache_lock:
+            # Only cache if nothing invalidated the entry while the calls ran
+            if self._cache.get(key, (None, None))[1] is pending:
+                self._cache[key] = (now + self.cache_ttl, pending)
+            
+            expired = [k for k, (expiry, _) in self._cache.items() if expiry is not None and expiry <= now]
+            for k in expired:
+                del self._cache[k]
+        
+        pending.set_result(results)
+        return dict(results)
+    
+    def _fan_out(self, method: str, args: tuple, timeout: float, action: str) -> Dict[str, List]:
+        """Issue the same call to every server concurrently and collect the results"""
+        futures = {}
         results = {}
         
         for server_name, client in self.servers.items():
             try:
-                matches = client.call_remote("search_files", pattern, "", True, timeout=30.0)
-                results[server_name] = matches
+                futures[server_name] = client.call_remote_async(method, *args)
             except Exception as e:
-                print(f"❌ Error searching {server_name}: {e}")
+                print(f"❌ Error {action} {server_name}: {e}")
+                results[server_name] = []
+        
+        for server_name, future in futures.items():
+            try:
+                results[server_name] = self._await_response(future, timeout=timeout)
+            except Exception as e:
+                print(f"❌ Error {action} {server_name}: {e}")
                 results[server_name] = []
         
         return results
     
+    def invalidate_cache(self):
+        """Drop cached listing and search results"""
+        with self._cache_lock:
+            self._cache.clear()
+    
     def replicate_file(self, file_path: str, from_server: str, to_servers: List[str]) -> Dict[str, bool]:
         """Replicate a file from one server to others"""
-        results = {}
+        results = {server_name: server_name in self.servers for server_name in to_servers}
+        
+        # Targets are about to change, so cached listings are stale
+        self.invalidate_cache()
         
-        # Read file from source server
         try:
             source_client = self.servers[from_server]
-            content = source_client.call_remote("read_file", file_path, timeout=60.0)
+            read_future = source_client.call_remote_async("stream_file", file_path, 0, CHUNK_SIZE)
         except Exception as e:
             print(f"❌ Failed to read file from {from_server}: {e}")
             return {server: False for server in to_servers}
         
-        # Write to target servers
-        for server_name in to_servers:
-            if server_name not in self.servers:
-                results[server_name] = False
-                continue
-                
+        # Stream the file in chunks, fanning each chunk out to every target
+        # while the next chunk is already being read from the source
+        offset = 0
+        while True:
             try:
-                client = self.servers[server_name]
-                success = client.call_remote("write_file", file_path, content, True, timeout=60.0)
-                results[server_name] = success
+                chunk = self._await_response(read_future, timeout=60.0)
             except Exception as e:
-                print(f"❌ Failed to replicate to {server_name}: {e}")
-                results[server_name] = False
+                print(f"❌ Failed to read file from {from_server}: {e}")
+                return {server: False for server in to_servers}
+            
+            final = len(chunk) < CHUNK_SIZE
+            targets = [name for name, ok in results.items() if ok]
+            
+            write_futures = {}
+            for server_name in targets:
+                try:
+                    write_futures[server_name] = self.servers[server_name].call_remote_async(
+                        "write_file_chunk", file_path, offset, chunk, final)
+                except Exception as e:
+                    print(f"❌ Failed to replicate to {server_name}: {e}")
+                    results[server_name] = False
+            
+            offset += len(chunk)
+            if not final and write_futures:
+                read_future = source_client.call_remote_async("stream_file", file_path, offset, CHUNK_SIZE)
+            
+            for server_name, future in write_futures.items():
+                try:
+                    results[server_name] = bool(self._await_response(future, timeout=60.0))
+                except Exception as e:
+                    print(f"❌ Failed to replicate to {server_name}: {e}")
+                    results[server_name] = False
+            
+            if final or not any(results.values()):
+                break
         
         return results
     
+    @staticmethod
+    def _await_response(future: Future, timeout: float):
+        """Wait for an async call and return its result, raising on remote errors"""
+        response = future.result(timeout=timeout)
+        if response.error:
+            raise RuntimeError(f"Remote error: {response.error}")
+        return response.result
+    
     def disconnect_all(self):
         """Disconnect from all servers"""
         for name in list(self.servers.keys()):
@@ -243,7 +453,7 @@ class DistributedFileManager:
 # Example usage
 if __name__ == "__main__":
     import sys
-    import threading
+    import signal
     
     def run_file_server(port: int):
         """Run a file manager server"""
@@ -251,21 +461,23 @@ if __name__ == "__main__":
         
         server = FileManagerAPI(f"/tmp/fileserver_{port}")
         
+        # Block on an event instead of polling; Ctrl+C sets it
+        stop_event = threading.Event()
+        signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+        
         try:
             server.start_server('localhost', port)
             print(f"✅ File server started on port {port}")
             
             # Create some test files
             server.write_file("test.txt", "Hello from file server!")
-            server.write_file("data/config.json", json.dumps({"port": port, "type": "file_server"}))
+            server.write_file("data/config.json", msgspec.json.encode({"port": port, "type": "file_server"}).decode())
             server.create_directory("uploads")
             
             print("Server running... Press Ctrl+C to stop")
-            while True:
-                time.sleep(1)
-                
-        except KeyboardInterrupt:
+            stop_event.wait()
             print(f"\n🛑 Stopping server on port {port}...")
+                
         except Exception as e:
             print(f"❌ Server error: {e}")
         finally:
@@ -7,12 +7,55 @@ with best practices and common patterns.
 """
 
 from typing import Dict, Set, List, Union, Any
+from collections import namedtuple
+import functools
 import inspect
 import logging
+import re
 
 # Set up security logging
 security_logger = logging.getLogger('remote_objects.security')
 
+# Name fragments that mark a method as potentially risky
+_RISKY_PATTERNS = (
+    'exec', 'eval', 'compile', 'open', 'file', 'input', 'raw_input',
+    'import', 'reload', 'delattr', 'setattr', 'getattr',
+    'system', 'popen', 'spawn', 'call'
+)
+# One alternation lets the regex engine scan each name once for all patterns
+_RISKY_RE = re.compile('|'.join(map(re.escape, _RISKY_PATTERNS)), re.IGNORECASE)
+
+_ClassAnalysis = namedtuple(
+    '_ClassAnalysis', ['names', 'dangerous', 'private', 'safe_methods', 'safe_properties', 'risky']
+)
+
+@functools.lru_cache(maxsize=256)
+def _analyze(cls: type) -> _ClassAnalysis:
+    """Categorize every attribute of a class in a single pass over dir()"""
+    names = dir(cls)
+    dangerous = []
+    private = []
+    safe_methods = []
+    safe_properties = []
+    risky = []
+    
+    for name in names:
+        if _RISKY_RE.search(name):
+            risky.append(name)
+        
+        # Categorize by name patterns
+        if name.startswith('__') and name.endswith('__'):
+            dangerous.append(name)
+        elif name.startswith('_'):
+            private.append(name)
+        elif callable(getattr(cls, name, None)):
+            safe_methods.append(name)
+        else:
+            safe_properties.append(name)
+    
+    return _ClassAnalysis(tuple(names), tuple(dangerous), tuple(private),
+                          tuple(safe_methods), tuple(safe_properties), tuple(risky))
+
 class SecurityProfile:
     """Predefined security profiles for common use cases"""
     
@@ -58,59 +101,29 @@ class SecurityAnalyzer:
     @staticmethod
     def analyze_class(cls: type) -> Dict[str, List[str]]:
         """Analyze a class and categorize its attributes by security risk"""
-        dangerous = []
-        private = []
-        safe_methods = []
-        safe_properties = []
-        
-        for name in dir(cls):
-            attr = getattr(cls, name, None)
-            
-            # Categorize by name patterns
-            if name.startswith('__') and name.endswith('__'):
-                dangerous.append(name)
-            elif name.startswith('_'):
-                private.append(name)
-            elif callable(attr):
-                if not name.startswith('_'):
-                    safe_methods.append(name)
-            else:
-                if not name.startswith('_'):
-                    safe_properties.append(name)
-        
+        analysis = _analyze(cls)
         return {
-            'dangerous': dangerous,
-            'private': private,
-            'safe_methods': safe_methods,
-            'safe_properties': safe_properties
+            'dangerous': list(analysis.dangerous),
+            'private': list(analysis.private),
+            'safe_methods': list(analysis.safe_methods),
+            'safe_properties': list(analysis.safe_properties)
         }
     
     @staticmethod
     def suggest_whitelist(cls: type, include_properties: bool = True) -> Set[str]:
         """Suggest a safe whitelist for a class"""
-        analysis = SecurityAnalyzer.analyze_class(cls)
-        whitelist = set(analysis['safe_methods'])
+        analysis = _analyze(cls)
+        whitelist = set(analysis.safe_methods)
         
         if include_properties:
-            whitelist.update(analysis['safe_properties'])
+            whitelist.update(analysis.safe_properties)
         
         return whitelist
     
     @staticmethod
     def find_risky_methods(cls: type) -> List[str]:
         """Find potentially risky methods in a class"""
-        risky_patterns = [
-            'exec', 'eval', 'compile', 'open', 'file', 'input', 'raw_input',
-            'import', 'reload', 'delattr', 'setattr', 'getattr',
-            'system', 'popen', 'spawn', 'call'
-        ]
-        
-        risky_methods = []
-        for name in dir(cls):
-            if any(pattern in name.lower() for pattern in risky_patterns):
-                risky_methods.append(name)
-        
-        return risky_methods
+        return list(_analyze(cls).risky)
 
 def configure_security(remote_server, profile_name: str = 'standard', 
                       custom_config: Dict[str, Any] = None):
@@ -145,16 +158,16 @@ def configure_security(remote_server, profile_name: str = 'standard',
 
 def audit_class_security(cls: type, proposed_whitelist: Set[str] = None) -> Dict[str, Any]:
     """Perform a security audit on a class"""
-    analysis = SecurityAnalyzer.analyze_class(cls)
-    risky_methods = SecurityAnalyzer.find_risky_methods(cls)
+    analysis = _analyze(cls)
+    risky_methods = list(analysis.risky)
     
     audit_result = {
         'class_name': cls.__name__,
-        'total_attributes': len(dir(cls)),
-        'dangerous_count': len(analysis['dangerous']),
-        'private_count': len(analysis['private']),
-        'safe_methods_count': len(analysis['safe_methods']),
-        'safe_properties_count': len(analysis['safe_properties']),
+        'total_attributes': len(analysis.names),
+        'dangerous_count': len(analysis.dangerous),
+        'private_count': len(analysis.private),
+        'safe_methods_count': len(analysis.safe_methods),
+        'safe_properties_count': len(analysis.safe_properties),
         'risky_methods': risky_methods,
         'recommended_whitelist': SecurityAnalyzer.suggest_whitelist(cls),
         'security_score': None
@@ -170,8 +183,8 @@ def audit_class_security(cls: type, proposed_whitelist: Set[str] = None) -> Dict
     
     # Check if proposed whitelist is safe
     if proposed_whitelist:
-        dangerous_in_whitelist = set(analysis['dangerous']).intersection(proposed_whitelist)
-        private_in_whitelist = set(analysis['private']).intersection(proposed_whitelist)
+        dangerous_in_whitelist = set(analysis.dangerous).intersection(proposed_whitelist)
+        private_in_whitelist = set(analysis.private).intersection(proposed_whitelist)
         risky_in_whitelist = set(risky_methods).intersection(proposed_whitelist)
         
         audit_result['whitelist_issues'] = {
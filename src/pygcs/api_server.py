@@ -2,51 +2,67 @@ from __future__ import annotations
 
 from .networking.server_client import Server, Client, NetworkObject
 from .networking.processor import MessageProcessor
-from .networking.message import Message
+from .networking.message import Message, WIRE_FORMAT
+from .networking.io import write_block, write_message, write_message_with_file
 from .networking.exceptions import ProcessorError
 from dataclasses import dataclass
+import os
+import asyncio
+import inspect
 import socket
 import json
-import uuid
-from typing import Any, Callable, Optional, Dict
-from concurrent.futures import Future, ThreadPoolExecutor
+import itertools
+import functools
+import weakref
 import threading
+import logging
+from typing import Any, Callable, Optional, Dict, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+def _shutdown_executor(executor: ThreadPoolExecutor):
+    """Stop the worker threads of a collected APIObject"""
+    executor.shutdown(wait=False)
+
+async def _await(awaitable):
+    """Await any awaitable, so asyncio.run can drive it"""
+    return await awaitable
+
+logger = logging.getLogger(__name__)
 
-@dataclass
+# Call ids only need to be unique among this process's pending calls
+_call_ids = itertools.count()
+
+@dataclass(slots=True)
 class APICall:
     method: str
     args: tuple
     kwargs: dict
-    call_id: str = None
+    call_id: int = None
     is_response: bool = False
     error: str = None
     result: Any = None
 
     def __post_init__(self):
         if self.call_id is None:
-            self.call_id = str(uuid.uuid4())
+            self.call_id = next(_call_ids)
 
-    def serialize(self) -> dict:
-        return {
-            'method': self.method,
-            'args': self.args,
-            'kwargs': self.kwargs,
-            'call_id': self.call_id,
-            'is_response': self.is_response,
-            'error': self.error,
-            'result': self.result
-        }
+    def serialize(self) -> list:
+        # A fixed-shape record, so field names are left off the wire. The
+        # result must stay last for FileRegion responses.
+        return [self.method, self.args, self.kwargs, self.call_id,
+                self.is_response, self.error, self.result]
 
     @classmethod
-    def deserialize(cls, data: dict) -> APICall:
+    def deserialize(cls, data: list) -> APICall:
+        method, args, kwargs, call_id, is_response, error, result = data
         return cls(
-            method=data['method'],
-            args=tuple(data['args']),
-            kwargs=data['kwargs'],
-            call_id=data.get('call_id'),
-            is_response=data.get('is_response', False),
-            error=data.get('error'),
-            result=data.get('result')
+            method=method,
+            args=tuple(args),
+            kwargs=kwargs,
+            call_id=call_id,
+            is_response=is_response,
+            error=error,
+            result=result
         )
 
     def create_response(self, result: Any = None, error: str = None) -> 'APICall':
@@ -61,6 +77,27 @@ class APICall:
             result=result
         )
 
+class FileRegion:
+    """
+    A byte range of an open binary file, returned by API methods that serve
+    file contents. The region is sent to the caller with sendfile when the
+    transport allows it and arrives as bytes; the file is closed once sent.
+    """
+
+    def __init__(self, file, offset: int = 0, count: int = None):
+        size = os.fstat(file.fileno()).st_size
+        self.file = file
+        self.offset: int = min(offset, size)
+        self.count: int = size - self.offset if count is None else max(0, min(count, size - self.offset))
+
+    def read(self) -> bytes:
+        """Read the region into memory"""
+        self.file.seek(self.offset)
+        return self.file.read(self.count)
+
+    def close(self):
+        self.file.close()
+
 def api_method(method_name: str = None):
     """Decorator to mark methods as API endpoints"""
     def decorator(func):
@@ -101,29 +138,61 @@ class APIObject(MessageProcessor):
     def __init__(self, api_name: str):
         super().__init__(api_name)
         self._api_methods: Dict[str, Callable] = {}
-        self._pending_calls: Dict[str, Future] = {}
-        self._call_lock = threading.Lock()
+        self._pending_calls: Dict[int, Future] = {}
+        # Held only for single table operations, so registering a call can't
+        # race _cancel_pending_calls swapping the table out
+        self._pending_lock: threading.Lock = threading.Lock()
         self._executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix=f"{api_name}-api")
+        # Anyone still waiting on a call keeps this object alive, so shutting
+        # the workers down is the only cleanup left once it is collected
+        weakref.finalize(self, _shutdown_executor, self._executor)
         self._network_object: Optional[NetworkObject] = None
+        self._is_server = False
+        
+        # Methods callable in the current mode, and errors for those that aren't
+        self._callable_methods: Dict[str, Callable] = {}
+        self._forbidden_methods: Dict[str, str] = {}
         
         # Discover API methods
         self._discover_api_methods()
+        self._partition_api_methods()
     
     def _discover_api_methods(self):
         """Discover all methods marked with @api_method decorator"""
-        for attr_name in dir(self):
-            attr = getattr(self, attr_name)
-            if callable(attr) and hasattr(attr, '_is_api_method'):
-                method_name = getattr(attr, '_api_method', attr_name)
-                self._api_methods[method_name] = attr
+        # Walk the class dictionaries rather than dir(self) so properties
+        # are never evaluated; the first definition found in the MRO wins
+        seen = set()
+        for cls in type(self).__mro__:
+            for attr_name, attr in vars(cls).items():
+                if attr_name in seen:
+                    continue
+                seen.add(attr_name)
+
+                if callable(attr) and hasattr(attr, '_is_api_method'):
+                    method_name = getattr(attr, '_api_method', attr_name)
+                    self._api_methods[method_name] = getattr(self, attr_name)
+    
+    def _partition_api_methods(self):
+        """Split API methods into callable and forbidden for the current mode"""
+        self._callable_methods = {}
+        self._forbidden_methods = {}
+        for method_name, method in self._api_methods.items():
+            if self._is_server and hasattr(method, '_client_only'):
+                self._forbidden_methods[method_name] = f"Method {method_name} is client-only"
+            elif not self._is_server and hasattr(method, '_server_only'):
+                self._forbidden_methods[method_name] = f"Method {method_name} is server-only"
+            else:
+                self._callable_methods[method_name] = method
     
     def set_server(self, network_object: NetworkObject):
         """Called by NetworkObject when this processor is added"""
         super().set_server(network_object)
         self._network_object = network_object
+        self._is_server = isinstance(network_object, Server)
+        self._partition_api_methods()
     
-    def call_remote(self, method: str, *args, timeout: float = 30.0, **kwargs) -> Any:
-        """Call a remote API method and wait for response"""
+    def _send_call(self, method: str, args: tuple, kwargs: dict) -> Tuple[int, Future]:
+        """Register a pending call and send it, returning its id and response future"""
         if self._network_object is None:
             raise RuntimeError("API object not attached to any network object")
         
@@ -132,48 +201,60 @@ class APIObject(MessageProcessor):
         
         # Create future for response
         future = Future()
-        with self._call_lock:
+        with self._pending_lock:
             self._pending_calls[api_call.call_id] = future
         
         try:
             # Send the call
             message = Message(content=self.content_type, data=api_call.serialize())
             self._network_object.send_message(message)
-            
+        except Exception:
+            self._forget_call(api_call.call_id)
+            raise
+        
+        return api_call.call_id, future
+    
+    def _forget_call(self, call_id: int):
+        """Drop a pending call that will no longer be waited on"""
+        with self._pending_lock:
+            self._pending_calls.pop(call_id, None)
+    
+    @staticmethod
+    def _unwrap_response(result: Any) -> Any:
+        """Return the result of a response, raising if the remote call failed"""
+        if isinstance(result, APICall):
+            if result.error:
+                raise RuntimeError(f"Remote error: {result.error}")
+            return result.result
+        else:
+            raise RuntimeError(f"Invalid response type: {type(result)}")
+    
+    def call_remote(self, method: str, *args, timeout: float = 30.0, **kwargs) -> Any:
+        """Call a remote API method and wait for response"""
+        call_id, future = self._send_call(method, args, kwargs)
+        
+        try:
             # Wait for response
-            result = future.result(timeout=timeout)
-            
-            # Handle response
-            if isinstance(result, APICall):
-                if result.error:
-                    raise RuntimeError(f"Remote error: {result.error}")
-                return result.result
-            else:
-                raise RuntimeError(f"Invalid response type: {type(result)}")
-                
-        except Exception as e:
+            return self._unwrap_response(future.result(timeout=timeout))
+        except Exception:
             # Clean up pending call
-            with self._call_lock:
-                self._pending_calls.pop(api_call.call_id, None)
+            self._forget_call(call_id)
+            raise
+    
+    async def call_remote_awaitable(self, method: str, *args, timeout: float = 30.0, **kwargs) -> Any:
+        """Call a remote API method from asyncio code without blocking a thread on the response"""
+        call_id, future = self._send_call(method, args, kwargs)
+        
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            return self._unwrap_response(result)
+        except BaseException:
+            self._forget_call(call_id)
             raise
     
     def call_remote_async(self, method: str, *args, **kwargs) -> Future:
         """Call a remote API method asynchronously"""
-        if self._network_object is None:
-            raise RuntimeError("API object not attached to any network object")
-        
-        # Create API call
-        api_call = APICall(method=method, args=args, kwargs=kwargs)
-        
-        # Create future for response
-        future = Future()
-        with self._call_lock:
-            self._pending_calls[api_call.call_id] = future
-        
-        # Send the call
-        message = Message(content=self.content_type, data=api_call.serialize())
-        self._network_object.send_message(message)
-        
+        _, future = self._send_call(method, args, kwargs)
         return future
     
     def process_message(self, message: Message, client_socket: socket.socket, address: tuple) -> bool:
@@ -198,7 +279,7 @@ class APIObject(MessageProcessor):
     
     def _handle_response(self, response: APICall):
         """Handle response to a remote call"""
-        with self._call_lock:
+        with self._pending_lock:
             future = self._pending_calls.pop(response.call_id, None)
         
         if future and not future.cancelled():
@@ -208,24 +289,12 @@ class APIObject(MessageProcessor):
         """Handle incoming method call"""
         method_name = api_call.method
         
-        if method_name not in self._api_methods:
-            # Send error response
-            error_response = api_call.create_response(error=f"Unknown method: {method_name}")
-            self._send_response(error_response, client_socket)
-            return
-        
-        method = self._api_methods[method_name]
-        
-        # Check if method is allowed in current mode
-        is_server = isinstance(self._network_object, Server)
+        method = self._callable_methods.get(method_name)
         
-        if is_server and hasattr(method, '_client_only'):
-            error_response = api_call.create_response(error=f"Method {method_name} is client-only")
-            self._send_response(error_response, client_socket)
-            return
-        
-        if not is_server and hasattr(method, '_server_only'):
-            error_response = api_call.create_response(error=f"Method {method_name} is server-only")
+        if method is None:
+            # Unknown, or not allowed in the current mode
+            error = self._forbidden_methods.get(method_name, f"Unknown method: {method_name}")
+            error_response = api_call.create_response(error=error)
             self._send_response(error_response, client_socket)
             return
         
@@ -233,6 +302,9 @@ class APIObject(MessageProcessor):
         def execute_method():
             try:
                 result = method(*api_call.args, **api_call.kwargs)
+                if inspect.isawaitable(result):
+                    # async def API methods run to completion on this worker
+                    result = asyncio.run(_await(result))
                 response = api_call.create_response(result=result)
                 self._send_response(response, client_socket)
             except Exception as e:
@@ -244,17 +316,46 @@ class APIObject(MessageProcessor):
     def _send_response(self, response: APICall, client_socket: socket.socket):
         """Send response back to caller"""
         try:
-            from .networking.io import write_message
+            if isinstance(response.result, FileRegion):
+                self._send_file_response(response, client_socket)
+                return
+
             message = Message(content=self.content_type, data=response.serialize())
-            write_message(client_socket, message)
-        except Exception:
-            # Failed to send response - connection might be closed
-            pass
+            try:
+                data = message.serialize()
+            except Exception as e:
+                # The result can't be encoded; tell the caller instead of
+                # leaving it to time out
+                logger.error("Could not encode response to %s: %s", response.method, e)
+                error_response = response.create_response(error=f"Could not encode result: {e}")
+                data = Message(content=self.content_type, data=error_response.serialize()).serialize()
+            write_block(client_socket, data)
+        except Exception as e:
+            # Connection might be closed
+            logger.warning("Failed to send response to %s: %s", response.method, e)
+    
+    def _send_file_response(self, response: APICall, client_socket: socket.socket):
+        """Send a FileRegion result, zero-copy when the wire format supports it"""
+        region: FileRegion = response.result
+
+        try:
+            if WIRE_FORMAT == 'msgpack' and hasattr(client_socket, 'sendfile'):
+                # The result is the last field of the call, so its bytes can
+                # follow the encoded message directly
+                response.result = None
+                message = Message(content=self.content_type, data=response.serialize())
+                write_message_with_file(client_socket, message, region.file, region.offset, region.count)
+            else:
+                response.result = region.read()
+                message = Message(content=self.content_type, data=response.serialize())
+                write_message(client_socket, message)
+        finally:
+            region.close()
     
     @property
     def is_server(self) -> bool:
         """Check if this API is attached to a server"""
-        return isinstance(self._network_object, Server)
+        return self._is_server
     
     @property
     def is_client(self) -> bool:
@@ -279,43 +380,31 @@ class APIObject(MessageProcessor):
         if self._network_object:
             self._network_object.stop()
         
-        # Cancel pending calls
-        with self._call_lock:
-            for future in self._pending_calls.values():
-                future.cancel()
-            self._pending_calls.clear()
+        self._cancel_pending_calls()
     
-    def __del__(self):
-        """Cleanup when object is destroyed"""
-        try:
-            # Cancel pending calls
-            with self._call_lock:
-                for future in self._pending_calls.values():
-                    future.cancel()
-                self._pending_calls.clear()
-            
-            self._executor.shutdown(wait=False)
-        except:
-            pass
+    def _cancel_pending_calls(self):
+        """Cancel every call still waiting for a response"""
+        with self._pending_lock:
+            pending, self._pending_calls = self._pending_calls, {}
+        for future in pending.values():
+            future.cancel()
+    
+
+@functools.lru_cache(maxsize=None)
+def _public_methods(cls: type) -> frozenset:
+    """Names of the public callables of a class"""
+    return frozenset(
+        attr_name for attr_name in dir(cls)
+        if not attr_name.startswith('_') and callable(getattr(cls, attr_name))
+    )
 
 class RemoteObject(APIObject):
     def __init__(self, api: APIProcessor, obj_id: str, original_class: type):
         self._api = api
         self._obj_id = obj_id
         self._original_class = original_class
-        self._cached_methods = set()
-        
-        # Discover and wrap methods from the original class
-        self._wrap_methods()
-    
-    def _wrap_methods(self):
-        """Dynamically create proxy methods for all public methods of the original class"""
-        for attr_name in dir(self._original_class):
-            if not attr_name.startswith('_'):
-                attr = getattr(self._original_class, attr_name)
-                if callable(attr):
-                    self._cached_methods.add(attr_name)
-                    setattr(self, attr_name, self._create_proxy_method(attr_name))
+        # Proxies are created on first use, see __getattr__
+        self._cached_methods = _public_methods(original_class)
     
     def _create_proxy_method(self, method_name: str):
         """Create a proxy method that forwards calls to the remote object"""
@@ -335,7 +424,10 @@ class RemoteObject(APIObject):
     def __getattr__(self, name):
         """Handle property access and unknown methods"""
         if name in self._cached_methods:
-            return getattr(self, name)
+            # Store the proxy on the instance so later lookups never get here
+            proxy = self._create_proxy_method(name)
+            object.__setattr__(self, name, proxy)
+            return proxy
         
         # For properties, make a remote call
         return self._api.send_request('get_property', self._obj_id, name, timeout=5)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from collections import deque
 from functools import wraps
+import queue
 import threading
-from typing import List, Dict
+from typing import Deque, Dict
 import time
 
 from ..signals import GlobalSignals
@@ -25,6 +27,10 @@ def custom_command(name):
         return inner
     return decorator
 
+def _encode_line(command: str) -> bytes:
+    """Encode a command as the line sent to GRBL"""
+    return (command + '\n').encode('utf-8')
+
 class GRBLController(Broadcastable):
     def __init__(self):
         super().__init__()
@@ -33,69 +39,140 @@ class GRBLController(Broadcastable):
 
         # Settings
         self.max_command_queue_size = 10
+        self.rx_buffer_size = 128  # GRBL serial RX buffer, in bytes
+        self.max_command_history = 1024
         self.status_query_frequency = 5
 
         # Command management
-        self.command_queue: List[CommandTracker] = []
-        self.planner_queue: List[CommandTracker] = []
-        self.command_history: List[CommandTracker] = []
+        self.command_queue: Deque[CommandTracker] = deque()
+        self.planner_queue: Deque[CommandTracker] = deque()
+        self.command_history: Deque[CommandTracker] = deque(maxlen=self.max_command_history)
+        self._rx_in_flight: int = 0  # Bytes sent but not yet acknowledged
         self.current_program: Program = None
         self.custom_commands: Dict[str, callable] = {}
 
         # Program state
         self._info: GRBLInfo = GRBLInfo()
         self.update_frequency: float = 10.0
-        self.paused = False
+        self._paused = False
         self.program_running = False
         self.program: Program = None
 
-        self.lock: threading.RLock = threading.RLock()
+        # Never re-entered: callbacks and serial writes run outside it
+        self.lock: threading.Lock = threading.Lock()
+        # Filled under self.lock so writes stay in command_queue order; the writer
+        # thread does the broadcast, so a slow serial write never stalls the main loop.
+        # Unbounded so a put never blocks under the lock: planned sends are already
+        # limited by max_command_queue_size and the RX buffer accounting
+        self._send_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer_thread: threading.Thread = None
+        # Notified whenever the queues, program or pause state change
+        self._queue_changed: threading.Condition = threading.Condition(self.lock)
         self.macro_path = './macros'
         self.running: bool = False
+        # Set on shutdown so no further status polls are scheduled
+        self._shutdown_event: threading.Event = threading.Event()
+        self._status_timer: threading.Timer = None
         self.last_probe: CommandTracker = None
+        self._message_handlers: Dict[str, callable] = {'o': self._on_ok, 'e': self._on_error}
 
         # Discover custom commands
-        for attr_name in dir(self):
-            attr = getattr(self, attr_name)
-
-            if not callable(attr):
-                continue
-
-            if hasattr(attr, '_custom_command'):
-                command_name = attr._command_name
-                self.custom_commands[command_name] = attr
+        for command_name, attr_name in self._custom_command_names().items():
+            self.custom_commands[command_name] = getattr(self, attr_name)
+
+    @classmethod
+    def _custom_command_names(cls) -> Dict[str, str]:
+        """Map custom command names to method names, built once per class"""
+        names = cls.__dict__.get('_custom_command_table')
+        if names is not None:
+            return names
+
+        # Scanning vars() of each class avoids triggering properties such as
+        # paused; subclasses override commands defined further up the MRO
+        names = {}
+        seen = set()
+        for klass in cls.__mro__:
+            for attr_name, attr in vars(klass).items():
+                if attr_name in seen:
+                    continue
+                seen.add(attr_name)
+
+                if callable(attr) and hasattr(attr, '_custom_command'):
+                    names.setdefault(attr._command_name, attr_name)
+
+        cls._custom_command_table = names
+        return names
+
+    @property
+    def paused(self) -> bool:
+        """Whether the main loop is holding back queued commands"""
+        return self._paused
+
+    @paused.setter
+    def paused(self, value: bool):
+        with self._queue_changed:
+            self._paused = value
+            self._queue_changed.notify_all()
+
+    def _notify_queue_changed(self):
+        """Wake the main loop and any waiters after a state change"""
+        with self._queue_changed:
+            self._queue_changed.notify_all()
+
+    def _has_work(self) -> bool:
+        """Check whether the main loop has anything to do"""
+        if not self.running:
+            return True
+        if self._paused:
+            return False
+        if self.program is not None and self.program_running != self.program.queued:
+            return True
+        if not self.planner_queue or len(self.command_queue) >= self.max_command_queue_size:
+            return False
+        command = self.planner_queue[0].command
+        return command[0] == '%' or self._fits_rx_buffer(len(_encode_line(command)))
+
+    def _fits_rx_buffer(self, size: int) -> bool:
+        """Check whether size bytes fit in GRBL's RX buffer alongside unacknowledged ones"""
+        return self._rx_in_flight == 0 or self._rx_in_flight + size <= self.rx_buffer_size
 
     def exec(self):
         """Main loop for the controller"""
         self.stopped = False
         self.running = True
-        thread = threading.Thread(target=self._continuous_updates, daemon=True)
-        thread.start()
+        self._shutdown_event.clear()
+        with self.lock:
+            # Also picks up anything queued while shut down
+            self._start_writer()
+        self._poll_status()
         while self.running:
-            if self.paused:
-                time.sleep(0.1)
-                continue
-
-            if self.program_running and not self.program.queued:
-                for tracker in self.program.trackers:
-                    if tracker.in_staging:
-                        self.planner_queue.append(tracker)
+            with self._queue_changed:
+                self._queue_changed.wait_for(self._has_work)
+
+            if not self.running:
+                break
+
+            with self.lock:
+                if self.program_running and not self.program.queued:
+                    staged = [tracker for tracker in self.program.trackers if tracker.in_staging]
+                    self.planner_queue.extend(staged)
+                    for tracker in staged:
                         tracker.planning()
-                self.program.queued = True
-
-            if not self.program_running and self.program and self.program.queued:
-                for tracker in self.program.trackers:
-                    if tracker.in_planning:
-                        self.planner_queue.remove(tracker)
-                        tracker.staging()
-                self.program.queued = False
-
-            if len(self.command_queue) < self.max_command_queue_size:
-                if self.planner_queue:
-                    tracker = self.planner_queue.pop(0)
-                    self.send_command(tracker)
-            
-            time.sleep(0.1)
+                    self.program.queued = True
+
+                if not self.program_running and self.program and self.program.queued:
+                    # Pull the program's unsent lines back out in one pass
+                    # rather than a deque.remove() scan per line
+                    unsent = {id(tracker) for tracker in self.program.trackers if tracker.in_planning}
+                    self.planner_queue = deque(
+                        tracker for tracker in self.planner_queue if id(tracker) not in unsent
+                    )
+                    for tracker in self.program.trackers:
+                        if id(tracker) in unsent:
+                            tracker.staging()
+                    self.program.queued = False
+
+            self._send_planned()
         self.stopped = True
         print("Controller main loop exited.")
     
@@ -115,8 +192,8 @@ class GRBLController(Broadcastable):
             tracker.wait(timeout=60)
             if tracker.errored:
                 print("Errors detected:", tracker.error_message)
-                self.queue_command('$X', immediate=True)
-                time.sleep(0.5)
+                # Retry as soon as the unlock is acknowledged
+                self.queue_command('$X', immediate=True).wait(timeout=5)
                 attempts -= 1
             else:
                 print("Homing successful")
@@ -125,25 +202,28 @@ class GRBLController(Broadcastable):
     @consumer(GlobalSignals.DISCONNECTED)
     def shutdown(self):
         self.running = False
+        self._shutdown_event.set()
+        if self._status_timer is not None:
+            self._status_timer.cancel()
+        with self._queue_changed:
+            writer, self._writer_thread = self._writer_thread, None
+            self._queue_changed.notify_all()
+        if writer is not None:
+            # Queued behind any pending data, so the writer finishes that first
+            self._send_queue.put_nowait(None)
 
     @custom_command('wait_for_idle')
     def wait_for_idle(self, timeout=60):
         print("Waiting for machine to become idle...")
-        time.sleep(0.5)
-        start_time = time.time()
-        while True:
-            if time.time() - start_time > timeout:
+        deadline = time.monotonic() + timeout
+        with self._queue_changed:
+            if not self._queue_changed.wait_for(lambda: not self.command_queue, timeout):
                 raise TimeoutError("Timeout waiting for machine to become idle.")
 
-            if len(self.command_queue) > 0:
-                time.sleep(0.5)
-                continue
-
-            if not self._info.is_idle:
-                time.sleep(0.1)
-                continue
-            
-            break
+        # Require a status report taken after the queue drained, so a stale
+        # Idle from before the last motion started doesn't count
+        if not self._info.wait_for_status(lambda info: info.is_idle, max(0, deadline - time.monotonic())):
+            raise TimeoutError("Timeout waiting for machine to become idle.")
         print("Machine is now idle.")
 
     @custom_command('wait_for_last_command')
@@ -160,47 +240,78 @@ class GRBLController(Broadcastable):
     def exec_macro(self, command):
         path = f"{self.macro_path}/{command}.g"
 
+        # The processor consumes the file line by line; no intermediate list
         with open(path, 'r') as file:
-            lines = file.readlines()
-
-        program = Program(self.processor, self._info, lines, name=f"macro_{command}", program_type="Macro")
+            program = Program(self.processor, self._info, file, name=f"macro_{command}", program_type="Macro")
         # for line, tracker in zip(program.lines, program.trackers):
         #     self.queue_command(line, tracker=tracker)
-        for tracker in program.trackers:
-            self.planner_queue.append(tracker)
-            tracker.planning()
+        with self._queue_changed:
+            for tracker in program.trackers:
+                self.planner_queue.append(tracker)
+                tracker.planning()
+            self._queue_changed.notify_all()
 
         return program
     
-    def _continuous_updates(self):
-        """Continuously update the controller state at a given frequency"""
-        while self.running:
-            start = time.time()
-            tracker = self.queue_command('?', immediate=True)
-            tracker.wait()
-            elapsed = time.time() - start
-            time.sleep(max(0, 1/self.update_frequency - elapsed))
+    def _poll_status(self):
+        """Request a status report; the next poll is scheduled once it is acknowledged"""
+        if self._shutdown_event.is_set():
+            return
+        tracker = CommandTracker(self._info, '?', callback=self._schedule_status_poll)
+        self.queue_command('?', immediate=True, tracker=tracker)
+
+    def _schedule_status_poll(self, tracker: CommandTracker):
+        """Schedule the next status poll at the configured update frequency"""
+        if self._shutdown_event.is_set():
+            return
+        delay = max(0, 1/self.update_frequency - (tracker.elapsed_time or 0))
+        timer = threading.Timer(delay, self._poll_status)
+        timer.daemon = True
+        self._status_timer = timer
+        timer.start()
 
     @consumer(GlobalSignals.DATA_RECEIVED)
     def receive_message(self, message):
-        if message == 'ok':
-            if self.command_queue:
-                completed_command = self.command_queue.pop(0)
-                completed_command.complete()
-                print(f"Command completed: {completed_command.command} in {completed_command.elapsed_time:.2f} seconds")
-            else:
-                print("Received 'ok' but command stack is empty.")
-        elif message.startswith('error'):
-            _, error_code = message.split(':')
-            error_code = int(error_code.strip())
+        # Dispatch on the first character; handlers confirm the full prefix
+        handler = self._message_handlers.get(message[:1])
+        if handler is not None:
+            handler(message)
 
-            completed_command = self.command_queue.pop(0) if self.command_queue else None
-            completed_command.error(error_code)
+    def _on_ok(self, message):
+        if message != 'ok':
+            return
 
-            print(f"Command failed with error: {completed_command.command} with error code {error_code}")
+        if self.command_queue:
+            with self._queue_changed:
+                completed_command = self.command_queue.popleft()
+                self._rx_in_flight -= completed_command.sent_bytes
+                self._queue_changed.notify_all()
+            completed_command.complete()
+            print(f"Command completed: {completed_command.command} in {completed_command.elapsed_time:.2f} seconds")
         else:
-            # print(f"Received message: {message}")
-            pass
+            print("Received 'ok' but command stack is empty.")
+
+    def _on_error(self, message):
+        if not message.startswith('error'):
+            return
+
+        _, error_code = message.split(':')
+        error_code = int(error_code.strip())
+
+        with self._queue_changed:
+            completed_command = self.command_queue.popleft() if self.command_queue else None
+            if completed_command is not None:
+                self._rx_in_flight -= completed_command.sent_bytes
+                self._queue_changed.notify_all()
+
+        if completed_command is None:
+            # Unsolicited, e.g. after a soft reset; nothing is waiting on it
+            print(f"Received 'error:{error_code}' but command stack is empty.")
+            return
+
+        completed_command.error(error_code)
+
+        print(f"Command failed with error: {completed_command.command} with error code {error_code}")
     
     @consumer(GlobalSignals.LOAD_PROGRAM)
     def load_program(self, program: str) -> Program:
@@ -222,11 +333,13 @@ class GRBLController(Broadcastable):
     @consumer(GlobalSignals.PROGRAM_START)
     def program_start(self):
         self.program_running = True
+        self._notify_queue_changed()
     
     @consumer(GlobalSignals.PROGRAM_STOP)
     def program_stop(self):
         """Stop the current program"""
         self.program_running = False
+        self._notify_queue_changed()
 
     @consumer("queue_immediate")
     def queue_immediate(self, command: str):
@@ -244,16 +357,18 @@ class GRBLController(Broadcastable):
         if tracker is None:
             tracker = CommandTracker(self, command)
         
+        if immediate:
+            # send_command only queues the write; the writer thread sends it
+            self.send_command(tracker)
+            return tracker
+
         with self.lock:
-            if immediate:
-                self.send_command(tracker)
-                return tracker
-            
             # print(f"Queuing command: {command}")
             if high_priority:
-                self.planner_queue.insert(0, tracker)
+                self.planner_queue.appendleft(tracker)
             else:
                 self.planner_queue.append(tracker)
+            self._queue_changed.notify_all()
         
         return tracker
     
@@ -269,21 +384,87 @@ class GRBLController(Broadcastable):
                 tracker.complete()
             except Exception as e:
                 tracker.error(str(e))
+            self.command_history.append(tracker)
         else:
-            broadcast(GlobalSignals.SEND_DATA, tracker.command + '\n')
-            tracker.submit()
-            self.command_queue.append(tracker)
-
-        self.command_history.append(tracker)
+            payload = _encode_line(tracker.command)
+            with self.lock:
+                accepted = not self._shutdown_event.is_set()
+                if accepted:
+                    self._track_sent(tracker, payload)
+                    self._queue_send(payload)
+            if not accepted:
+                tracker.error("Controller is shut down")
     
+    def _send_planned(self):
+        """Send as many planned commands as fit in GRBL's RX buffer with a single write"""
+        payloads = []
+        custom = None
+        head_is_custom = False
+        with self.lock:
+            while self.planner_queue and len(self.command_queue) < self.max_command_queue_size:
+                tracker = self.planner_queue[0]
+                # Resolved once, so the size checked is exactly what gets sent
+                command = tracker.command
+                if command[0] == '%':
+                    head_is_custom = True
+                    break
+                payload = _encode_line(command)
+                if not self._fits_rx_buffer(len(payload)):
+                    break
+                self.planner_queue.popleft()
+                self._track_sent(tracker, payload)
+                payloads.append(payload)
+
+            if payloads:
+                self._queue_send(b''.join(payloads))
+            # Custom commands run on their own once everything before them is sent
+            elif head_is_custom or (self.planner_queue and self.planner_queue[0].command[0] == '%'):
+                custom = self.planner_queue.popleft()
+
+        if custom is not None:
+            self.send_command(custom)
+
+    def _queue_send(self, data: bytes):
+        """Hand data to the writer thread; the caller holds self.lock"""
+        self._send_queue.put_nowait(data)
+        # After shutdown the data waits for exec() to start a new writer
+        if not self._shutdown_event.is_set():
+            self._start_writer()
+
+    def _start_writer(self):
+        """Start the writer thread if it isn't running; the caller holds self.lock"""
+        if self._writer_thread is None:
+            self._writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer_thread.start()
+
+    def _write_loop(self):
+        """Broadcast queued data to the serial link until shutdown"""
+        while (data := self._send_queue.get()) is not None:
+            try:
+                broadcast(GlobalSignals.SEND_DATA, data)
+            except Exception as e:
+                # Keep draining; a dead writer would strand everything queued after this
+                print(f"❌ Failed to send data: {e}")
+
+    def _track_sent(self, tracker: CommandTracker, payload: bytes):
+        """Record a command as sent and awaiting acknowledgement"""
+        tracker.submit()
+        tracker.sent_bytes = len(payload)
+        self._rx_in_flight += tracker.sent_bytes
+        self.command_queue.append(tracker)
+        self.command_history.append(tracker)
+
     def check_idle(self):
         """Check if the controller is idle"""
-        with self.lock:
-            # TODO: Check if commands in queue are motion commands
-            return len(self.command_queue) == 0 and self._info.is_idle
+        # A snapshot read; waiters block on _queue_changed instead of polling this
+        # TODO: Check if commands in queue are motion commands
+        return not self.command_queue and self._info.is_idle
 
     def wait(self):
         """Waits for command stack to be empty and machine to be idle"""
-        while not self.check_idle():
-            time.sleep(0.1)
+        with self._queue_changed:
+            self._queue_changed.wait_for(lambda: not self.command_queue)
+
+        if not self._info.is_idle:
+            self._info.wait_for_status(lambda info: info.is_idle)
 
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import List, Tuple
 from functools import wraps
 import re
+import threading
 from dataclasses import dataclass
 
 @dataclass
@@ -39,6 +40,11 @@ modal_groups = {
     }
 }
 
+# Line-level patterns, compiled once rather than looked up per line
+_COMMENT_RE = re.compile(r'\((.*?)\)')
+_COMMENT_SPAN_RE = re.compile(r'\(.+\)')
+_TOKEN_RE = re.compile(r'(\D(([-0123456789.]+)|(\[.+?\])))')
+
 def split_code(code: str):
     """Split a G-code into its components"""
     code_type = code[0].lower()
@@ -104,20 +110,25 @@ class GCodeProcessor:
         if line.startswith(';'):
             return "", line[1:].strip()
         
-        comments = re.findall(r'\((.*?)\)', line)
-        line = re.sub(r'\(.+\)', '', line)  # Remove comments
+        if '(' not in line:
+            return line.strip(), []
+
+        comments = _COMMENT_RE.findall(line)
+        line = _COMMENT_SPAN_RE.sub('', line)  # Remove comments
 
         return line.strip(), comments
 
     def strip_whitespace(self, line: str) -> str:
         """Strip whitespace from a G-code line"""
-        return re.sub(r'\s+', ' ', line).strip()
+        # split() drops leading/trailing whitespace and collapses runs in one C pass
+        return ' '.join(line.split())
 
     def process_lines(self, lines: str):
         """Add a line of G-code and return the tokens"""
 
         comments_all: List[str] = []
         tokens_all: List[List[Token]]  = []
+        transformers = self.token_transformers
         for line in lines:
             line = line.strip()
             line, comments = self.extract_comments(line)
@@ -144,7 +155,7 @@ class GCodeProcessor:
                 token = tokens[self.current_token]
 
                 token_transformed = False
-                for transformer in self.token_transformers:
+                for transformer in transformers:
                     if transformer in token.metadata['visited']:
                         continue
 
@@ -161,7 +172,7 @@ class GCodeProcessor:
                         break
 
                 if not token_transformed:
-                    for transformer in self.token_transformers:
+                    for transformer in transformers:
                         transformer.observe(token)
                     self.current_token += 1
             self.current_token = 0
@@ -296,7 +307,7 @@ class GCodeProcessor:
 
     def tokenize(self, line: str) -> List[Token]:
         """Create tokens from a G-code line"""
-        tokens = re.findall(r'(\D(([-0123456789.]+)|(\[.+?\])))', line)
+        tokens = _TOKEN_RE.findall(line)
         tokens = [Token(token[0]) for token in tokens if token[0]]  # Flatten the tuple and remove empty strings
         return tokens
 
@@ -332,6 +343,8 @@ class TokenTransformer:
         pass
 
 _gcode_processor: GCodeProcessor = None
+# Guards set_gcode_processor; get_gcode_processor never locks
+_gcode_processor_lock = threading.Lock()
 
 def get_gcode_processor() -> GCodeProcessor:
     """Get the global GCodeProcessor instance"""
@@ -343,9 +356,10 @@ def get_gcode_processor() -> GCodeProcessor:
 def set_gcode_processor(processor: GCodeProcessor):
     """Set the global GCodeProcessor instance"""
     global _gcode_processor
-    if _gcode_processor is not None:
-        raise RuntimeError("GCodeProcessor is already set")
-    _gcode_processor = processor
+    with _gcode_processor_lock:
+        if _gcode_processor is not None:
+            raise RuntimeError("GCodeProcessor is already set")
+        _gcode_processor = processor
 
 gcode_processor = GCodeProcessor()
 set_gcode_processor(gcode_processor)
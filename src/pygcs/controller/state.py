@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+import threading
 from enum import StrEnum
 from typing import Any, Dict, Set
 import numpy as np
@@ -11,6 +12,9 @@ from ..signals import GlobalSignals
 
 _state_variables = set()
 
+# One "Key:values" field of a status report such as <Idle|MPos:0.000,0.000,0.000|FS:0,0>
+_STATUS_FIELD_RE = re.compile(r'([A-Za-z]+):([^|]*)')
+
 def grbl_state_var(func):
     """Decorator to register a function as a GRBL state variable"""
     _state_variables.add(func.__name__)
@@ -26,17 +30,10 @@ class State(StrEnum):
     @staticmethod
     def decode(s: str) -> State:
         """Decode a string into an Idle state"""
-        match s.lower():
-            case "idle":
-                return State.IDLE
-            case "run":
-                return State.RUN
-            case "alarm":
-                return State.ALARM
-            case "home":
-                return State.HOME
-            case _:
-                return State.UNKNOWN
+        return _STATE_NAMES.get(s.lower(), State.UNKNOWN)
+
+# Status reports decode with one hash lookup instead of a chain of comparisons
+_STATE_NAMES: Dict[str, State] = {state.value.lower(): state for state in State}
 
 class GRBLInfo(Broadcastable):
     def __init__(self):
@@ -48,6 +45,10 @@ class GRBLInfo(Broadcastable):
         self.data: Dict[str, Any] = {}
 
         self.state: State = State.UNKNOWN
+        self.status_count: int = 0
+        self._status_received: threading.Condition = threading.Condition()
+
+        self._message_handlers: Dict[str, callable] = {'<': self._on_status, '[': self._on_feedback}
 
     @property
     def is_idle(self) -> bool:
@@ -66,6 +67,13 @@ class GRBLInfo(Broadcastable):
     def posz(self):
         return self.probe_data[2]
 
+    def wait_for_status(self, predicate: callable, timeout: float = None) -> bool:
+        """Wait for a status report newer than the current one that satisfies predicate"""
+        with self._status_received:
+            after = self.status_count
+            return self._status_received.wait_for(
+                lambda: self.status_count > after and predicate(self), timeout)
+
     def get_var(self, name: str):
         """Get a runtime variable by name"""
         if name in self.runtime_variables:
@@ -75,22 +83,41 @@ class GRBLInfo(Broadcastable):
     
     @consumer(GlobalSignals.DATA_RECEIVED)
     def receive_message(self, message):
-        if message.startswith('<') and message.endswith('>'):
-            
-            info = message[1:-1].split('|')
-            new_state = State.decode(info[0])
-            if new_state != self.state:
-                self.state = new_state
-                # print(f"State updated: {self.state}")
-
-            for item in info[1:]:
-                key, value = item.split(':')
-
-                data = [float(v) for v in value.split(',')]
-                self.data[key] = data
-            # print(f"Runtime variables updated: {self.runtime_variables}")
-        elif message.startswith('['):
-            source, values, *rest = message[1:-1].split(':')
-            if source == 'PRB':
-                self.probe_data = [float(v) for v in values.split(',')]
-                print(f"Probe data: {self.probe_data}")
\ No newline at end of file
+        # Status reports start with '<', probe and other feedback with '['
+        handler = self._message_handlers.get(message[:1])
+        if handler is not None:
+            handler(message)
+
+    def _on_status(self, message):
+        if not message.endswith('>'):
+            return
+
+        state_name, _, fields = message[1:-1].partition('|')
+        new_state = State.decode(state_name)
+        if new_state != self.state:
+            self.state = new_state
+            # print(f"State updated: {self.state}")
+
+        for key, value in _STATUS_FIELD_RE.findall(fields):
+            try:
+                numbers = list(map(float, value.split(',')))
+            except ValueError:
+                # Non-numeric fields such as Pn:XYZ are kept as text
+                self.data[key] = value
+                continue
+
+            self.data[key] = numbers
+            if key == 'MPos' and len(numbers) == len(self.position):
+                # Written in place, so anyone holding the array sees it move
+                self.position[:] = numbers
+
+        with self._status_received:
+            self.status_count += 1
+            self._status_received.notify_all()
+        # print(f"Runtime variables updated: {self.runtime_variables}")
+
+    def _on_feedback(self, message):
+        source, values, *rest = message[1:-1].split(':')
+        if source == 'PRB':
+            self.probe_data = [float(v) for v in values.split(',')]
+            print(f"Probe data: {self.probe_data}")
\ No newline at end of file
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 import time
 from enum import StrEnum
 from typing import TYPE_CHECKING, Dict
@@ -9,6 +10,13 @@ if TYPE_CHECKING:
     from .state import GRBLInfo
 
 
+_HAS_RUNTIME_VAR_RE = re.compile(r'^.+\[.+\].*$')
+_RUNTIME_VAR_RE = re.compile(r'\[([^\]]+)\]')
+
+# Guards creating a tracker's done event against the command finishing meanwhile
+_done_event_lock = threading.Lock()
+
+
 class CommandStage(StrEnum):
     PLANNING = "planning"
     SUBMITTED = "submitted"
@@ -18,6 +26,13 @@ class CommandStage(StrEnum):
     STAGING = "staging"
 
 class CommandTracker:
+    # Programs create one tracker per line, so keep them free of a __dict__
+    __slots__ = (
+        'grbl_info', '_command', 'info', 'callback', 'runtime_var', '_template',
+        'start_timestamp', 'stop_timestamp', 'elapsed_time', 'sent_bytes',
+        'result', 'error_message', 'stage', '_done_event',
+    )
+
     def __init__(self, grbl_info: GRBLInfo, command: str, info: Dict = None, callback: callable = None):
         self.grbl_info: GRBLInfo = grbl_info
         self._command: str = command
@@ -25,15 +40,23 @@ class CommandTracker:
         self.info: Dict = info or {}
 
         self.callback: callable = callback
-        self.runtime_var: bool = re.match(r'^.+\[.+\].*$', command) is not None
+        # Most lines have no brackets at all, so skip the regex for them
+        self.runtime_var: bool = '[' in command and _HAS_RUNTIME_VAR_RE.match(command) is not None
+        # Split once into literal text (even indices) and variable names (odd indices),
+        # so each send only looks the variables up instead of re-running the regex
+        self._template: list = _RUNTIME_VAR_RE.split(command) if self.runtime_var else None
 
+        # Monotonic clock readings, only meaningful relative to each other
         self.start_timestamp: float = None
         self.stop_timestamp: float = None
         self.elapsed_time: float = 0
+        self.sent_bytes: int = 0
         
         self.result: str = None
         self.error_message: str = None
         self.stage: CommandStage = CommandStage.STAGING
+        # Only created once someone waits on an unfinished command
+        self._done_event: threading.Event = None
 
     @property
     def done(self) -> bool:
@@ -44,13 +67,11 @@ class CommandTracker:
     def command(self) -> str:
         """Return the command string, updating runtime variables if needed"""
         if self.runtime_var:
-            command = self._command
-            runtime_variables = re.findall(r'\[([^\]]+)\]', command)
-            command = re.sub(r'\[([^\]]+)\]', '{}', self._command)  # Remove runtime variables from command
-            values = []
-            for var in runtime_variables:
-                values.append(str(self.grbl_info.get_var(var)))
-            return command.format(*values)
+            get_var = self.grbl_info.get_var
+            return ''.join(
+                part if i % 2 == 0 else str(get_var(part))
+                for i, part in enumerate(self._template)
+            )
         else:
             return self._command
 
@@ -103,10 +124,10 @@ class CommandTracker:
         if self.stage != CommandStage.SUBMITTED:
             raise RuntimeError("Cannot complete command that is not submitted.")
 
-        self.stop_timestamp = time.time()
+        self.stop_timestamp = time.monotonic()
         if self.start_timestamp:
             self.elapsed_time = self.stop_timestamp - self.start_timestamp
-        self.stage = CommandStage.COMPLETED
+        self._finish(CommandStage.COMPLETED)
 
         if self.callback:
             self.callback(self)
@@ -116,24 +137,33 @@ class CommandTracker:
         if self.stage != CommandStage.PLANNING:
             raise RuntimeError("Cannot cancel command that is not in planning stage.")
         
-        self.stop_timestamp = time.time()
+        self.stop_timestamp = time.monotonic()
         if self.start_timestamp:
             self.elapsed_time = self.stop_timestamp - self.start_timestamp
-        self.stage = CommandStage.CANCELLED
+        self._finish(CommandStage.CANCELLED)
         
         if self.callback:
             self.callback(self)
     
+    def _finish(self, stage: CommandStage):
+        """Move to a final stage and wake anyone waiting"""
+        with _done_event_lock:
+            self.stage = stage
+            event = self._done_event
+        if event is not None:
+            event.set()
+
     def wait(self, timeout=None):
-        if self.stage in (CommandStage.COMPLETED, CommandStage.CANCELLED, CommandStage.ERROR):
-            return
-        
-        start_time = time.time()
-        while self.stage not in (CommandStage.COMPLETED, CommandStage.CANCELLED, CommandStage.ERROR):
-            if timeout:
-                if time.time() - start_time > timeout:
-                    raise TimeoutError(f"Command '{self.command}' timed out.")
-            time.sleep(0.1)
+        """Block until the command is done"""
+        with _done_event_lock:
+            if self.done:
+                return
+            if self._done_event is None:
+                self._done_event = threading.Event()
+            event = self._done_event
+
+        if not event.wait(timeout or None):
+            raise TimeoutError(f"Command '{self.command}' timed out.")
     
     def submit(self):
         """Submit the command to the controller"""
@@ -141,7 +171,7 @@ class CommandTracker:
             raise RuntimeError("Cannot submit command that is not in planning stage.")
 
         self.stage = CommandStage.SUBMITTED
-        self.start_timestamp = time.time()
+        self.start_timestamp = time.monotonic()
     
     def set_result(self, result: str):
         """Set the result of the command execution"""
@@ -149,5 +179,8 @@ class CommandTracker:
     
     def error(self, error_message: str):
         """Set an error message for the command"""
-        self.stage = CommandStage.ERROR
         self.error_message = error_message
+        self._finish(CommandStage.ERROR)
+
+        if self.callback:
+            self.callback(self)
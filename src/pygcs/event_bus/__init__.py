@@ -8,6 +8,8 @@ def intercept_print(event):
     @broadcast_func
     def inner(*values: object, sep: str | None = " ", end: str | None = "\n", 
               file = None, flush: bool = False):
+        if not get_event_host().has_subscribers(event):
+            return
         message = sep.join(str(value) for value in values)
         # caller_frame = inspect.currentframe().f_back
         # caller_function = caller_frame.f_code.co_name
@@ -1,41 +1,79 @@
 from __future__ import annotations
 
 from .event import Event
-from typing import List
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Iterable, List
 import weakref
 
 class EventHandler:
     def __init__(self, name=None):
         self._name = name or f"EventHandler-{id(self)}"
         self._forwarding = [] # Send a copy of all signals here
-        self._event_history = []  # For debugging/replay
+        self._event_history: Deque[Event] = deque(maxlen=1024)  # For debugging/replay
+        self._history_enabled = False
         self._forwarding = []
+        self._signal_forwarding: Dict[str, List[EventHandler]] = {} # Only these signals go here
     
     @property
     def name(self) -> str:
         return self._name
     
     @property
-    def event_history(self) -> List[Event]:
+    def event_history(self) -> Deque[Event]:
         return self._event_history
 
+    def enable_history(self, max_events: int = 1024):
+        """Start recording received events, keeping only the most recent max_events"""
+        self._event_history = deque(self._event_history, maxlen=max_events)
+        self._history_enabled = True
+
+    def disable_history(self):
+        """Stop recording received events"""
+        self._history_enabled = False
+
     @property
     def forwarding(self) -> List[EventHandler]:
         return self._forwarding
     
-    def forward_to(self, gateway: EventHandler):
-        """Add a gateway function to forward all events to"""
-        self.forwarding.append(gateway)
+    def forward_to(self, gateway: EventHandler, signals: Iterable[str] = None):
+        """Add a gateway to forward all events to, or only the given signals"""
+        # Each gateway appears at most once among the targets of any signal,
+        # so forward() never delivers the same event to it twice
+        if signals is None:
+            if gateway not in self.forwarding:
+                self.forwarding.append(gateway)
+            # It now sees every signal, so drop its per-signal entries
+            self._remove_signal_forwarding(gateway)
+            return
+
+        if gateway in self.forwarding:
+            return
+
+        for signal in signals:
+            gateways = self._signal_forwarding.setdefault(signal, [])
+            if gateway not in gateways:
+                gateways.append(gateway)
     
     def remove_forwarding(self, gateway: EventHandler):
         """Remove a gateway function from forwarding"""
         if gateway in self.forwarding:
             self.forwarding.remove(gateway)
+        self._remove_signal_forwarding(gateway)
+
+    def _remove_signal_forwarding(self, gateway: EventHandler):
+        """Remove a gateway from every per-signal forwarding list"""
+        for signal, gateways in list(self._signal_forwarding.items()):
+            if gateway in gateways:
+                gateways.remove(gateway)
+                if not gateways:
+                    del self._signal_forwarding[signal]
 
     def receive(self, event: Event):
         """Entry point for all events received and generated by this handler"""
         # For debugging/replay
-        self.event_history.append(event)
+        if self._history_enabled:
+            self._event_history.append(event)
 
         # Record this node in the path
         event.get_local_path().append(self.name)
@@ -55,7 +93,11 @@ class EventHandler:
             # Don't forward to gateways if this is a local-only event
             return
 
-        for gateway in self.forwarding:
+        # Gateways subscribed to specific signals only see those signals
+        gateways = self._signal_forwarding.get(event.signal)
+        targets = self.forwarding if not gateways else self.forwarding + gateways
+
+        for gateway in targets:
             if gateway.name in local_path:
                 # Don't forward to previous nodes in the path (avoid loops)
                 continue
@@ -76,8 +118,9 @@ class EventHandler:
         if signal:
             history = [event for event in history if event.signal == signal]
         if limit:
-            history = history[-limit:]
-        return history
+            start = max(0, len(history) - limit)
+            return list(islice(history, start, None))
+        return list(history)
     
     def clear_history(self):
         """Clear the event history"""
@@ -2,8 +2,11 @@ from .handler import EventHandler
 from typing import Dict, List, Tuple, Union
 from .event import Event, broadcast_func, get_metastate
 from .runtime import set_event_host, get_event_host
+import logging
 import threading
 
+logger = logging.getLogger(__name__)
+
 class EventMetadata:
     def __init__(self, host: EventHandler, metadata: Dict[str, Union[str, List[str]]]):
         self._host = host
@@ -53,17 +56,49 @@ class EventHost(EventHandler):
             name = f"EventHost-{id(self)}"
 
         super().__init__(name)
-        self.instances: Dict[str, list] = {} # class.name -> List[instance]
+        self.instances: Dict[str, Dict[int, object]] = {} # class.name -> {id(instance): instance}
         self.consumers: Dict[str, List[Tuple[callable, Union[str, None]]]] = {}
         self.lock: threading.RLock = threading.RLock()
+        # signal -> ((callable, error source), ...), rebuilt after registration changes
+        self._handler_cache: Dict[str, Tuple[Tuple[callable, str], ...]] = {}
+
+    def _get_handlers(self, signal) -> Tuple[Tuple[callable, str], ...]:
+        """Get the resolved handlers for a signal, building them on first use"""
+        handlers = self._handler_cache.get(signal)
+        if handlers is not None:
+            return handlers
+
+        with self.lock:
+            resolved = []
+            for func, cls_name in self.consumers.get(signal, []):
+                if cls_name is None:
+                    # Standalone function - call directly
+                    resolved.append((func, 'standalone_function'))
+                else:
+                    # Class method - bind to all instances of the class
+                    for instance in self.instances.get(cls_name, {}).values():
+                        resolved.append((func.__get__(instance), cls_name))
+            handlers = self._handler_cache[signal] = tuple(resolved)
+        return handlers
+
+    def _invalidate_handlers(self, cls_name=None):
+        """Drop resolved handlers after consumers or instances change"""
+        if cls_name is None:
+            self._handler_cache.clear()
+            return
+
+        # Only signals consumed by this class bind its instances
+        for signal, consumers in self.consumers.items():
+            if any(name == cls_name for _, name in consumers):
+                self._handler_cache.pop(signal, None)
 
     def process(self, event) -> Event:
-        target_consumers = self.consumers.get(event.signal, [])
+        target_consumers = self._get_handlers(event.signal)
 
         # Print the event trace for debugging
         if event._metadata.get('_trace', True) and event._metadata.get('_debug', False):
             with EventMetadata(self, {'_trace': False, '_forward': False}):
-                print(f"🔄 Processing event: {event.signal} with {len(target_consumers)} consumers")
+                print(f"🔄 Processing event: {event.signal} with {len(self.consumers.get(event.signal, []))} consumers")
                 print(f"🔄 Args: {event.args}, Kwargs: {event.kwargs}")
                 for arg in event.args:
                     print(f"🔄 Arg: {arg}")
@@ -81,29 +116,45 @@ class EventHost(EventHandler):
             pass
         
         # Send the event to registered consumers
-        for func, cls_name in target_consumers:
-            if cls_name is None:
-                # Standalone function - call directly
-                try:
-                    func(*event.args, **event.kwargs)
-                except Exception as e:
-                    # Error handling for robust addon system
-                    self.broadcast('broadcast_error', event.signal, 'standalone_function', e)
-            else:
-                # Class method - call on all instances of the class
-                for instance in self.instances.get(cls_name, []):
-                    try:
-                        func(instance, *event.args, **event.kwargs)
-                    except Exception as e:
-
-                        # Error handling for robust addon system
-                        self.broadcast('broadcast_error', event.signal, cls_name, e)
+        self._dispatch(target_consumers, event.signal, event.args, event.kwargs)
 
         # Return unmodified event for further processing if needed
         return event
 
+    def _dispatch(self, handlers, signal, args, kwargs):
+        """Call each handler, reporting failures without stopping the rest"""
+        for handler, source in handlers:
+            try:
+                handler(*args, **kwargs)
+            except Exception as e:
+                # Error handling for robust addon system
+                self._report_error(signal, source, e)
+
+    def _report_error(self, signal, source, error: Exception):
+        """Report a consumer failure as a broadcast_error event, or log it if nobody listens"""
+        if signal == 'broadcast_error' or not self.has_subscribers('broadcast_error'):
+            # Never re-broadcast a failing error handler's own error
+            logger.error("Consumer %s failed handling %r", source, signal, exc_info=error)
+            return
+
+        self.broadcast('broadcast_error', signal, source, error)
+
+    def has_subscribers(self, signal) -> bool:
+        """Check whether broadcasting a signal would reach any consumer or gateway"""
+        return bool(self._get_handlers(signal) or self.forwarding or self._signal_forwarding.get(signal))
+
     @broadcast_func
     def broadcast(self, signal, *args, _metadata=None, **kwargs):
+        handlers = self._get_handlers(signal)
+        if not (self.forwarding or self._signal_forwarding.get(signal)):
+            if not handlers:
+                # Nothing would see this event, so don't build or record it
+                return
+            if not (_metadata or self._history_enabled or get_metastate()):
+                # Only local consumers and nothing to trace: skip the Event and its path bookkeeping
+                self._dispatch(handlers, signal, args, kwargs)
+                return
+
         event = Event(signal, args, kwargs, _metadata or {})
         self.receive(event)
 
@@ -125,10 +176,14 @@ class EventHost(EventHandler):
                 func._broadcast_class_name = cls_name
                 
                 # For class methods, store the class name for instance lookup
-                self.consumers.setdefault(signal, []).append((func, cls_name))
+                with self.lock:
+                    self.consumers.setdefault(signal, []).append((func, cls_name))
+                    self._invalidate_handlers()
             else:
                 # For standalone functions, store None as the class name
-                self.consumers.setdefault(signal, []).append((func, None))
+                with self.lock:
+                    self.consumers.setdefault(signal, []).append((func, None))
+                    self._invalidate_handlers()
                 
             return func
         return decorator
@@ -136,7 +191,9 @@ class EventHost(EventHandler):
     def register_instance(self, instance):
         """Register an instance to receive broadcast signals"""
         cls_name = instance.__class__.__name__
-        self.instances.setdefault(cls_name, []).append(instance)
+        with self.lock:
+            self.instances.setdefault(cls_name, {})[id(instance)] = instance
+            self._invalidate_handlers(cls_name)
         # if namespace:
         #     self.namespaces[cls_name] = namespace
         
@@ -145,17 +202,22 @@ class EventHost(EventHandler):
     
     def unregister_instance(self, instance):
         """Unregister an instance from receiving broadcasts"""
-        cls_name = instance.__class__.__name__
-        instances_list = self.instances.get(cls_name, [])
-        if instance in instances_list:
-            instances_list.remove(instance)
-            # Clean up empty lists
-            if not instances_list:
-                del self.instances[cls_name]
+        self.discard_instance_id(instance.__class__.__name__, id(instance))
         
         # Emit unregistration event
         self.broadcast('instance_unregistered', instance)
     
+    def discard_instance_id(self, cls_name: str, instance_id: int):
+        """Drop a registration by class name and id"""
+        with self.lock:
+            class_instances = self.instances.get(cls_name)
+            if class_instances is None or class_instances.pop(instance_id, None) is None:
+                return
+            # Clean up empty classes
+            if not class_instances:
+                del self.instances[cls_name]
+            self._invalidate_handlers(cls_name)
+    
     def get_registered_consumers(self, signal=None):
         """Get list of registered consumers, optionally for a specific signal"""
         if signal:
@@ -165,18 +227,15 @@ class EventHost(EventHandler):
     def get_registered_instances(self, cls_name=None):
         """Get registered instances, optionally for a specific class"""
         if cls_name:
-            return self.instances.get(cls_name, [])
-        return self.instances.copy()
+            return list(self.instances.get(cls_name, {}).values())
+        return {name: list(class_instances.values()) for name, class_instances in self.instances.items()}
     
 class Broadcastable:
     """Base class for objects that can receive broadcast events"""
     def __init__(self):
         # self._broadcast_namespace = namespace
+        # The host keeps a strong reference until unregister_instance is called
         get_event_host().register_instance(self)
-        pass
-    
-    def __del__(self):
-        get_event_host().unregister_instance(self)
 
 events = EventHost()
 set_event_host(events)
\ No newline at end of file
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from .event import broadcast_func
 from typing import TYPE_CHECKING, Optional, Union
+import threading
 
 if TYPE_CHECKING:
     from .host import EventHost
@@ -9,19 +10,23 @@ if TYPE_CHECKING:
 # Global registry to hold the singleton
 _event_host: Optional[EventHost] = None
 
+# Only taken when setting; reads stay a lock-free None check
+_event_host_lock = threading.Lock()
+
 def set_event_host(host: EventHost):
     """Set the global event host singleton"""
     global _event_host
-    if _event_host is not None:
-        raise RuntimeError("Event host is already set")
-    _event_host = host
+    with _event_host_lock:
+        if _event_host is not None:
+            raise RuntimeError("Event host is already set")
+        _event_host = host
 
 def get_event_host() -> EventHost:
     """Get the global event host singleton"""
-    global _event_host
-    if _event_host is None:
+    host = _event_host
+    if host is None:
         raise RuntimeError("Event host is not set. Call set_event_host() first.")
-    return _event_host
+    return host
 
 @broadcast_func
 def broadcast(signal, *args, _metadata=None, **kwargs):
@@ -45,11 +45,6 @@ class EventProcessor(MessageProcessor, EventHandler):
 
     def process(self, event: Event) -> Event:
         """Forward local events to all connected clients"""
-        message = Message(
-            content='event',
-            data=event.to_dict()
-        )
-
         if event._metadata.get('_local_only', False):
             # Don't send local-only events to other devices
             return event
@@ -57,11 +52,15 @@ class EventProcessor(MessageProcessor, EventHandler):
         # Get the device list to avoid sending back to devices that have already seen this event
         devices, _ = event.get_path_data()
 
+        # Encoded at most once, however many clients receive it
+        data = None
         for socket in self.server.connections:
             device_name = self.get_path_name(socket)
             if device_name in devices:
                 continue
 
-            socket.send_message(message)
+            if data is None:
+                data = Message(content='event', data=event.to_dict()).serialize()
+            socket.send_block(data)
         
         return event
@@ -1,4 +1,4 @@
 from .processor import MessageProcessor
 from .server_client import Server, Client, NetworkObject, SocketConnection
 from .message import Message
-from .io import read_message, write_message, read_block, write_block
\ No newline at end of file
+from .io import read_message, write_message, write_message_with_file, read_block, write_block
\ No newline at end of file
@@ -2,4 +2,7 @@ class MessageFormatError(Exception):
     """Exception raised for errors in the message format."""
     def __init__(self, message: str):
         super().__init__(message)
-        self.message = message
\ No newline at end of file
+        self.message = message
+
+class ProcessorError(Exception):
+    """Exception raised when a message processor fails to handle a message."""
@@ -1,18 +1,107 @@
-from .message import Message
+from .message import Message, encode_payload, WIRE_FORMAT
+from .exceptions import MessageFormatError
+from collections import deque
 import socket
-import json
 import struct
+import threading
+import weakref
 
-def _recv_exact(sock: socket.socket, num_bytes: int) -> bytes:
+# Blocks are framed with a 4-byte big-endian length prefix
+_HEADER = struct.Struct("!I")
+
+# Sent by both ends when a connection opens, before any block. Peers on a
+# different protocol version or wire format (including older releases that
+# used a 2-byte length prefix and json) are rejected instead of misframed.
+PROTOCOL_VERSION = 2
+_PREAMBLE = b'PGCS' + bytes([PROTOCOL_VERSION]) + WIRE_FORMAT[:1].encode('ascii')
+
+# Stay well under the kernel's IOV_MAX when gathering buffers into one sendmsg
+_MAX_IOV = 512
+
+class _SendState:
+    """Per-socket send lock plus the buffers queued for whoever holds it"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = deque()
+
+# Per-socket send state so blocks written from different threads don't interleave
+_send_states: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_send_states_guard = threading.Lock()
+
+def _send_state(sock: socket.socket) -> _SendState:
+    """Get the send state for a socket"""
+    state = _send_states.get(sock)
+    if state is None:
+        with _send_states_guard:
+            state = _send_states.setdefault(sock, _SendState())
+    return state
+
+# Ask the kernel to fill the whole request in one recv where it can
+_RECV_FLAGS = getattr(socket, "MSG_WAITALL", 0)
+
+def _recv_exact(sock: socket.socket, num_bytes: int) -> bytearray:
     """Receive exactly num_bytes from socket, handling partial reads"""
-    data = b''
-    while len(data) < num_bytes:
-        chunk = sock.recv(num_bytes - len(data))
-        if not chunk:  # Connection closed
+    data = bytearray(num_bytes)
+    view = memoryview(data)
+    received = 0
+    while received < num_bytes:
+        count = sock.recv_into(view[received:], num_bytes - received, _RECV_FLAGS)
+        if not count:  # Connection closed
             return b''
-        data += chunk
+        received += count
     return data
 
+def _send_buffers(sock: socket.socket, buffers: list) -> None:
+    """Send buffers in order with as few gathered writes as possible"""
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b''.join(buffers))
+        return
+
+    while buffers:
+        sent = sock.sendmsg(buffers[:_MAX_IOV])
+        # Drop what went out, trimming a buffer the kernel only took part of
+        done = 0
+        while done < len(buffers) and sent >= len(buffers[done]):
+            sent -= len(buffers[done])
+            done += 1
+        buffers = buffers[done:]
+        if sent:
+            buffers[0] = memoryview(buffers[0])[sent:]
+
+def _flush_pending(sock: socket.socket, state: _SendState) -> None:
+    """Send everything queued on a socket; the caller holds state.lock"""
+    buffers = []
+    while state.pending:
+        buffers.extend(state.pending.popleft())
+    if buffers:
+        _send_buffers(sock, buffers)
+
+def _send_framed(sock: socket.socket, header: bytes, payload) -> None:
+    """Queue a framed block and send it, together with any queued by other threads"""
+    state = _send_state(sock)
+    state.pending.append((header, payload))
+    with state.lock:
+        # Whoever holds the lock sends every block queued so far, so a burst
+        # of concurrent writers goes out in one syscall instead of one each
+        _flush_pending(sock, state)
+
+def write_preamble(sock: socket.socket) -> None:
+    """Announce this end's protocol version and wire format"""
+    sock.sendall(_PREAMBLE)
+
+def read_preamble(sock: socket.socket) -> bool:
+    """Check the peer's preamble; False if the connection closed first"""
+    preamble = _recv_exact(sock, len(_PREAMBLE))
+    if not preamble:
+        return False
+
+    if preamble != _PREAMBLE:
+        raise MessageFormatError(
+            f"Peer protocol {bytes(preamble)!r} does not match {_PREAMBLE!r}; both ends "
+            f"need the same pygcs protocol version and PYGCS_WIRE setting"
+        )
+    return True
+
 def read_message(sock) -> Message:
     """Read a Message object from a socket"""
     data = read_block(sock)
@@ -27,29 +116,46 @@ def write_message(sock: socket.socket, message: Message):
     # print("Sending message:", message.serialize())
     write_block(sock, message.serialize())
 
-def read_block(sock: socket.socket) -> str:
+def write_message_with_file(sock: socket.socket, message: Message, file, offset: int, count: int):
+    """
+    Send a Message whose last value is count bytes of file starting at offset.
+    The file bytes are sent with sendfile, so they go from the page cache to
+    the socket without passing through Python.
+    """
+    prefix = message.serialize_with_trailing_bin(count)
+
+    state = _send_state(sock)
+    with state.lock:
+        state.pending.append((_HEADER.pack(len(prefix) + count), prefix))
+        _flush_pending(sock, state)
+        sent = sock.sendfile(file, offset, count) if count else 0
+        if sent < count:
+            # The file shrank after the header went out; pad to keep the stream framed
+            sock.sendall(bytes(count - sent))
+
+def read_block(sock: socket.socket) -> bytes:
     """Read a block of data prefixed by its size"""
-    header = _recv_exact(sock, 2)  # Read exactly 2 bytes for block size
+    header = _recv_exact(sock, _HEADER.size)
     if not header:
         return None
     
-    block_size = struct.unpack("!H", header)[0]
+    block_size = _HEADER.unpack(header)[0]
     if block_size == 0:
-        return ""
+        return b""
     
     data = _recv_exact(sock, block_size)
     if not data:
         return None
 
-    # print(data.decode('utf-8'))  # Debug print
-    return data.decode('utf-8')
+    return data
 
-def write_block(sock: socket.socket, data: str | dict) -> None:
+def write_block(sock: socket.socket, data: bytes | str | dict) -> None:
     """Send a block of data prefixed by its size"""
     if isinstance(data, str):
         message = data.encode('utf-8')
+    elif isinstance(data, (bytes, bytearray)):
+        message = data
     else:
-        message = json.dumps(data).encode('utf-8')
-    block_size = struct.pack("!H", len(message))
-    sock.sendall(block_size + message)
+        message = encode_payload(data)
+    _send_framed(sock, _HEADER.pack(len(message)), message)
 
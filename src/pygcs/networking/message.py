@@ -1,21 +1,111 @@
 from __future__ import annotations
 
 from typing import Dict
+import os
+import gc
 import json
+import base64
 from dataclasses import dataclass
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Wire encoding for message payloads. msgpack is used when msgspec is
+# available; set PYGCS_WIRE=json to fall back to json for debugging.
+WIRE_FORMAT = os.environ.get('PYGCS_WIRE', 'msgpack' if msgspec else 'json').lower()
+
+# Decoding a large payload allocates many containers, which would trigger
+# cyclic GC passes part way through. Encoding only produces bytes, so it
+# doesn't need the same treatment.
+_GC_PAUSE_THRESHOLD = 16 * 1024
+
+def _gc_paused(decode):
+    """Wrap a decoder so the cyclic GC is paused while decoding large payloads"""
+    def wrapper(data):
+        if len(data) < _GC_PAUSE_THRESHOLD or not gc.isenabled():
+            return decode(data)
+
+        gc.disable()
+        try:
+            return decode(data)
+        finally:
+            gc.enable()
+    return wrapper
+
+if WIRE_FORMAT == 'msgpack':
+    if msgspec is None:
+        raise ImportError("PYGCS_WIRE=msgpack requires the msgspec package")
+
+    _encoder = msgspec.msgpack.Encoder()
+    _decoder = msgspec.msgpack.Decoder()
+
+    encode_payload = _encoder.encode
+    decode_payload = _gc_paused(_decoder.decode)
+    DecodeError = msgspec.DecodeError
+elif WIRE_FORMAT == 'json':
+    # json has no binary type, so bytes travel as {"__bytes__": "<base64>"}
+    # and decode back to bytes, matching what msgpack bin values give
+    _BYTES_KEY = '__bytes__'
+
+    def _encode_default(obj):
+        if isinstance(obj, (bytes, bytearray, memoryview)):
+            return {_BYTES_KEY: base64.b64encode(obj).decode('ascii')}
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def _decode_object(obj: dict):
+        if len(obj) == 1 and _BYTES_KEY in obj:
+            return base64.b64decode(obj[_BYTES_KEY])
+        return obj
+
+    def encode_payload(obj) -> bytes:
+        return json.dumps(obj, default=_encode_default).encode('utf-8')
+
+    @_gc_paused
+    def decode_payload(data: bytes):
+        return json.loads(data, object_hook=_decode_object)
+
+    DecodeError = ValueError
+else:
+    raise ValueError(f"Unknown wire format: {WIRE_FORMAT}")
+
+def _bin_header(size: int) -> bytes:
+    """msgpack header for a bin value of the given size"""
+    if size < 0x100:
+        return b'\xc4' + size.to_bytes(1, 'big')
+    if size < 0x10000:
+        return b'\xc5' + size.to_bytes(2, 'big')
+    return b'\xc6' + size.to_bytes(4, 'big')
+
 @dataclass
 class Message:
     content: str
     data: Dict
 
     @staticmethod
-    def deserialize(data: str) -> Message:
-        data = json.loads(data)
+    def deserialize(data: bytes) -> Message:
+        data = decode_payload(data)
         return Message.from_dict(data)
     
-    def serialize(self) -> str:
-        return json.dumps(self.to_dict())
+    def serialize(self) -> bytes:
+        return encode_payload(self.to_dict())
+
+    def serialize_with_trailing_bin(self, size: int) -> bytes:
+        """
+        Serialize a message whose last encoded value is None, replacing that
+        value with the header of a bin value of size bytes. The caller sends
+        the raw bytes right after, so they never need to be copied into the
+        payload buffer.
+        """
+        if WIRE_FORMAT != 'msgpack':
+            raise NotImplementedError("Trailing bin values require the msgpack wire format")
+
+        data = self.serialize()
+        if data[-1:] != b'\xc0':
+            raise ValueError("Last encoded value of the message must be None")
+
+        return data[:-1] + _bin_header(size)
     
     def to_dict(self) -> dict:
         return {
@@ -28,4 +118,4 @@ class Message:
         return Message(
             content=data.get('content', ''),
             data=data.get('data', {})
-        )
\ No newline at end of file
+        )
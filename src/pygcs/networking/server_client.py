@@ -2,13 +2,21 @@ from __future__ import annotations
 
 import socket
 import threading
-import json
 from typing import Tuple
-from .io import read_message, write_message
-from .message import Message
+from .io import read_message, read_preamble, write_block, write_preamble
+from .message import Message, DecodeError
 from .processor import MessageProcessor
+from .exceptions import MessageFormatError
 from concurrent.futures import ThreadPoolExecutor
 
+def _set_tcp_nodelay(sock: socket.socket):
+    """Disable Nagle's algorithm so small RPC messages are sent immediately"""
+    if hasattr(socket, 'TCP_NODELAY'):
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+
 class NetworkObject:
     def __init__(self):
         self.connections: list[SocketConnection] = []
@@ -41,14 +49,18 @@ class NetworkObject:
     
     def send_message(self, message: Message, address=None):
         """Send a message to all registered connections"""
+        # Encoded once and shared by every connection it goes to
+        data = None
         for connection in self.connections:
             client_address = connection.address
             if address is not None and client_address != address:
                 continue
 
             try:
-                # print(f"Sending message to {client_address}: {message.serialize()}")
-                connection.send_message(message)
+                if data is None:
+                    data = message.serialize()
+                # print(f"Sending message to {client_address}: {data}")
+                connection.send_block(data)
             except Exception as e:
                 # print(f"❌ Failed to send message to {connection.address}: {e}")
                 self.connection_closed(connection)
@@ -71,6 +83,12 @@ class SocketConnection(threading.Thread):
         self.address: Tuple = address
         self.running: bool = False
         self._executer: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=4)
+        try:
+            # Goes out before anything else this end sends
+            write_preamble(sock)
+        except OSError as e:
+            # The receive loop sees the closed socket and cleans up
+            print(f"❌ Failed to send preamble to {address}: {e}")
 
     def run(self):
         """Start the thread to handle communication"""
@@ -80,6 +98,9 @@ class SocketConnection(threading.Thread):
     def _receive_messages(self):
         """Handle communication with a connected client"""
         try:
+            if not self._read_preamble():
+                return
+
             while self.running:
                 try:
                     # Receive data from client
@@ -94,15 +115,27 @@ class SocketConnection(threading.Thread):
                 except UnicodeDecodeError:
                     pass
                     # print(f"❌ Client {self.address} sent invalid UTF-8 data - disconnecting")
-                except json.JSONDecodeError:
+                except DecodeError:
                     pass
-                    # print(f"❌ Client {self.address} sent invalid JSON - disconnecting")
+                    # print(f"❌ Client {self.address} sent an undecodable message - disconnecting")
         except Exception as e:
             self.running = False
             print(f"❌ Error in socket thread for {self.address}: {e}")
         finally:
             self._cleanup()  # Use the existing cleanup method
     
+    def _read_preamble(self) -> bool:
+        """Wait for the peer's preamble; False if it disconnected first"""
+        while self.running:
+            try:
+                return read_preamble(self.sock)
+            except socket.timeout:
+                continue
+            except MessageFormatError as e:
+                print(f"❌ Rejected connection from {self.address}: {e}")
+                return False
+        return False
+
     def _process_message(self, message: Message):
         """Process a received message in a separate thread"""
         try:
@@ -113,8 +146,12 @@ class SocketConnection(threading.Thread):
     
     def send_message(self, message: Message):
         """Send a message to a specific client socket"""
+        self.send_block(message.serialize())
+
+    def send_block(self, data: bytes):
+        """Send an already serialized message to a specific client socket"""
         try:
-            write_message(self.sock, message)
+            write_block(self.sock, data)
         except Exception as e:
             print(f"❌ Failed to send message to {self.address}: {e}")
             # self._cleanup()  # Use the existing cleanup method
@@ -142,10 +179,11 @@ class SocketConnection(threading.Thread):
         self.parent.connection_closed(self)
 
 class Server(NetworkObject):
-    def __init__(self, host='localhost', port=8888):
+    def __init__(self, host='localhost', port=8888, tcp_nodelay=True):
         super().__init__()
         self.host: str = host
         self.port: int = port
+        self.tcp_nodelay: bool = tcp_nodelay
         self.running: bool = False
 
     def connect(self) -> bool:
@@ -177,6 +215,8 @@ class Server(NetworkObject):
             while self.running:
                 try:
                     client_socket, address = self.server_socket.accept()
+                    if self.tcp_nodelay:
+                        _set_tcp_nodelay(client_socket)
                     # print(f"📡 Client connected from {address}")
                     
                     # Start a thread to handle this client
@@ -223,10 +263,11 @@ class Server(NetworkObject):
             self.stop()
 
 class Client(NetworkObject):
-    def __init__(self, server_host='localhost', server_port=8888):
+    def __init__(self, server_host='localhost', server_port=8888, tcp_nodelay=True):
         super().__init__()
         self.server_host: str = server_host
         self.server_port: int = server_port
+        self.tcp_nodelay: bool = tcp_nodelay
 
     @property
     def running(self) -> bool:
@@ -237,6 +278,8 @@ class Client(NetworkObject):
         try:
             server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             server_socket.settimeout(1)
+            if self.tcp_nodelay:
+                _set_tcp_nodelay(server_socket)
             server_socket.connect((self.server_host, self.server_port))
         except Exception as e:
             return False
@@ -7,9 +7,10 @@ import socket
 from concurrent.futures import Future, ThreadPoolExecutor
 import threading
 from typing import Dict, List, Literal, Any, Union
-from functools import wraps
+from functools import lru_cache, wraps
 import weakref
 import uuid
+import time
 
 @dataclass
 class RemoteCall:
@@ -130,6 +131,16 @@ class RemoteObjectGet(RemoteCallBase):
     def get_call_type(cls) -> str:
         return 'remote_object_get'
 
+@dataclass
+class RemoteObjectGetMany(RemoteCallBase):
+    """Data structure for fetching several attributes in one round-trip"""
+    obj_id: str = None
+    attr_names: list = None
+    
+    @classmethod
+    def get_call_type(cls) -> str:
+        return 'remote_object_get_many'
+
 @dataclass
 class RemoteObjectSet(RemoteCallBase):
     """Data structure for remote object calls"""
@@ -193,7 +204,9 @@ class RemoteObjectServer(MessageProcessor):
         self._allowed_classes: List[str] = []
         
         # Security controls
-        self._allowed_attributes: Dict[str, set] = {}  # class_name -> {allowed_attrs}
+        self._allowed_attributes: Dict[str, frozenset] = {}  # class_name -> {allowed_attrs}
+        self._attribute_access_cache: Dict[tuple, tuple] = {}  # (class, attr_name) -> (generation, allowed)
+        self._access_generation: int = 0  # Bumped after every security configuration change
         self._blocked_attributes: set = {
             '__class__', '__dict__', '__globals__', '__locals__', '__code__',
             '__import__', '__builtins__', '__subclasshook__', '__reduce__',
@@ -432,6 +445,23 @@ class RemoteObjectServer(MessageProcessor):
 
         return self.encode_data(getattr(obj, attr_name))
     
+    @remote_call_handler(RemoteObjectGetMany)
+    def handle_remote_object_get_many(self, remote_call: RemoteObjectGetMany):
+        obj = self.get_object(remote_call.obj_id)
+        
+        values = {}
+        for attr_name in remote_call.attr_names:
+            # Same checks as a single get, applied to every requested attribute
+            if not self._is_attribute_allowed(obj, attr_name):
+                raise ValueError(f"Access to attribute '{attr_name}' is not allowed for class '{obj.__class__.__name__}'")
+            
+            if not hasattr(obj, attr_name):
+                raise ValueError(f"Object does not have attribute '{attr_name}'")
+            
+            values[attr_name] = getattr(obj, attr_name)
+
+        return self.encode_data(values)
+    
     @remote_call_handler(RemoteObjectSet)
     def handle_remote_object_set(self, remote_call: RemoteObjectSet):
         obj_id = remote_call.obj_id
@@ -502,25 +532,49 @@ class RemoteObjectServer(MessageProcessor):
     def set_strict_mode(self, enabled: bool):
         """Enable/disable strict mode. When enabled, only explicitly allowed attributes are accessible."""
         self._enable_strict_mode = enabled
+        self._access_config_changed()
     
     def add_allowed_attributes(self, class_name: str, attributes: Union[str, Iterable[str]]):
         """Add allowed attributes for a specific class"""
         if isinstance(attributes, str):
             attributes = [attributes]
         
-        if class_name not in self._allowed_attributes:
-            self._allowed_attributes[class_name] = set()
-        
-        self._allowed_attributes[class_name].update(attributes)
+        allowed_attrs = self._allowed_attributes.get(class_name, frozenset())
+        self._allowed_attributes[class_name] = allowed_attrs.union(attributes)
+        self._access_config_changed()
     
     def add_blocked_attributes(self, attributes: Union[str, Iterable[str]]):
         """Add globally blocked attributes"""
         if isinstance(attributes, str):
             attributes = [attributes]
         self._blocked_attributes.update(attributes)
+        self._access_config_changed()
+
+    def _access_config_changed(self):
+        """Invalidate cached access checks, including ones still being computed"""
+        self._access_generation += 1
+        self._attribute_access_cache.clear()
     
     def _is_attribute_allowed(self, obj: object, attr_name: str) -> bool:
         """Check if attribute access is allowed for the given object"""
+        # Results are memoized per (class, attribute) and tagged with the
+        # configuration generation they were computed under, so a check that
+        # raced a configuration change is never reused. The cache is bounded
+        # since attribute names come from remote callers.
+        key = (obj.__class__, attr_name)
+        generation = self._access_generation
+        cached = self._attribute_access_cache.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        allowed = self._check_attribute_allowed(obj.__class__.__name__, attr_name)
+        if len(self._attribute_access_cache) >= 4096:
+            self._attribute_access_cache.clear()
+        self._attribute_access_cache[key] = (generation, allowed)
+        return allowed
+    
+    def _check_attribute_allowed(self, class_name: str, attr_name: str) -> bool:
+        """Apply the access rules for an attribute of the given class"""
         # Always block dangerous attributes
         if attr_name in self._blocked_attributes:
             return False
@@ -529,12 +583,10 @@ class RemoteObjectServer(MessageProcessor):
         if attr_name.startswith('_'):
             return False
         
-        class_name = obj.__class__.__name__
-        
         # In strict mode, only explicitly allowed attributes are permitted
         if self._enable_strict_mode:
-            allowed_attrs = self._allowed_attributes.get(class_name, set())
-            return attr_name in allowed_attrs
+            allowed_attrs = self._allowed_attributes.get(class_name)
+            return allowed_attrs is not None and attr_name in allowed_attrs
         
         # In non-strict mode, allow all non-private, non-blocked attributes
         return True
@@ -696,6 +748,8 @@ class RemoteCallableAttribute:
         self._name = name
 
     def __call__(self, *args, **kwargs):
+        # The call may change any property of the remote object
+        self._remote_obj._prop_cache.clear()
         args = self._remote_obj._client.encode_data(args)
         kwargs = self._remote_obj._client.encode_data(kwargs)
         remote_call = RemoteObjectCall(
@@ -708,25 +762,41 @@ class RemoteCallableAttribute:
         return future.result(timeout=60)
 
 
+@lru_cache(maxsize=None)
+def _public_methods(cls: type) -> frozenset:
+    """Names of the public callables of a class"""
+    return frozenset(
+        attr for attr in dir(cls)
+        if not attr.startswith('_') and callable(getattr(cls, attr))
+    )
+
+def _copy_mutable(value: Any) -> Any:
+    """Copy the lists and dicts of a decoded value, leaving anything else shared"""
+    # Proxies inside the value stay shared; copying one would release the remote object
+    if isinstance(value, list):
+        return [_copy_mutable(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _copy_mutable(item) for key, item in value.items()}
+    return value
+
 class RemoteObject:
     """Proxy object that forwards method calls and property access to a remote object"""
     
+    # Seconds a fetched property value is served locally before asking again
+    _prop_ttl: float = 0.05
+    
     def __init__(self, obj_id: str, client: ClientProcessor, original_class: type = None):
         self._client: ClientProcessor = client
         self._obj_id: str = obj_id
         self._original_class: type = original_class
         self._callables = dict()
+        self._prop_cache: Dict[str, tuple] = {}  # name -> (value, expiry)
         
-        # Create remote attributes for all eligible attributes
+        # Names of remote methods; their proxies are created on first use
         if original_class:
-            for attr in dir(original_class):
-                if not attr.startswith('_'):
-                    if callable(getattr(original_class, attr)):
-                        self._callables[attr] = RemoteCallableAttribute(self, attr)
+            self._callable_names = _public_methods(original_class)
         else:
-            callables = self._client.call("list_callables", args=[self._obj_id])
-            for attr in callables:
-                self._callables[attr] = RemoteCallableAttribute(self, attr)
+            self._callable_names = frozenset(self._client.call("list_callables", args=[self._obj_id]))
 
     def __del__(self):
         try:
@@ -742,18 +812,45 @@ class RemoteObject:
         if attr := self._callables.get(name, None):
             return attr
 
+        if name in self._callable_names:
+            attr = self._callables[name] = RemoteCallableAttribute(self, name)
+            return attr
+
+        # Callers get their own copy of containers, so mutating a result
+        # never changes what later reads see from the cache
+        cached = self._prop_cache.get(name)
+        if cached is not None and cached[1] > time.monotonic():
+            return _copy_mutable(cached[0])
+
         remote_get = RemoteObjectGet(
             obj_id=self._obj_id,
             attr_name=name
         )
         future = self._client.send_remote_call(remote_get)
-        return future.result(timeout=60)
+        value = future.result(timeout=60)
+        self._prop_cache[name] = (value, time.monotonic() + self._prop_ttl)
+        return _copy_mutable(value)
+
+    def _prefetch(self, *names) -> Dict[str, Any]:
+        """Fetch several properties in one round-trip and cache them"""
+        remote_get = RemoteObjectGetMany(
+            obj_id=self._obj_id,
+            attr_names=list(names)
+        )
+        future = self._client.send_remote_call(remote_get)
+        values = future.result(timeout=60)
+
+        expiry = time.monotonic() + self._prop_ttl
+        for name, value in values.items():
+            self._prop_cache[name] = (value, expiry)
+        return _copy_mutable(values)
 
     def __setattr__(self, name, value):
         if name.startswith('_'):
             super().__setattr__(name, value)
             return
         
+        self._prop_cache.pop(name, None)
         value = self._client.encode_data(value)
 
         remote_set = RemoteObjectSet(
@@ -765,6 +862,7 @@ class RemoteObject:
         return future.result(timeout=60)
     
     def __call__(self, *args, **kwargs):
+        self._prop_cache.clear()
         args = self._client.encode_data(args)
         kwargs = self._client.encode_data(kwargs)
         remote_call = RemoteObjectCall(
@@ -1,7 +1,7 @@
 import serial
 import threading
 from .signals import GlobalSignals
-from .event_bus import Broadcastable, broadcast, consumer, local_broadcast
+from .event_bus import Broadcastable, broadcast, consumer, local_broadcast, get_event_host
 
 class GRBLSerial(threading.Thread, Broadcastable):
     def __init__(self, port, baudrate=115200):
@@ -14,12 +14,23 @@ class GRBLSerial(threading.Thread, Broadcastable):
 
     def run(self):
         self.running = True
+        pending = bytearray()
         while self.running:
             try:
-                line = self.ser.readline().decode('utf-8').rstrip()
-                if line:
-                    broadcast(GlobalSignals.DATA_RECEIVED, line)
-                    # print(f"Received: {line}")
+                # readline() costs a read per byte; take whatever has arrived
+                # instead, blocking for the first byte when nothing has
+                chunk = self.ser.read(self.ser.in_waiting or 1)
+                if not chunk:
+                    continue
+                pending += chunk
+
+                *lines, rest = pending.split(b'\n')
+                pending = bytearray(rest)
+                for raw in lines:
+                    line = raw.decode('utf-8').rstrip()
+                    if line:
+                        broadcast(GlobalSignals.DATA_RECEIVED, line)
+                        # print(f"Received: {line}")
             except Exception as e:
                 if self.running:
                     print("ERROR:" + f"Serial read error: {e}")
@@ -27,12 +38,17 @@ class GRBLSerial(threading.Thread, Broadcastable):
         print("Serial listener thread exited.")
 
     @consumer(GlobalSignals.SEND_DATA)
-    def send_command(self, command: str):
+    def send_command(self, command: str | bytes):
         if self.ser.is_open:
-            command_str = command.strip() + '\n'
-            self.ser.write(command_str.encode('utf-8'))
+            if isinstance(command, bytes):
+                # Already encoded and newline-terminated by the controller
+                payload = command
+            else:
+                payload = (command.strip() + '\n').encode('utf-8')
+            self.ser.write(payload)
             self.ser.flush()
-            broadcast(GlobalSignals.DATA_SENT, command_str)
+            if get_event_host().has_subscribers(GlobalSignals.DATA_SENT):
+                broadcast(GlobalSignals.DATA_SENT, payload.decode('utf-8'))
         else:
             broadcast(GlobalSignals.ERROR_LOG, "Serial port is not open")
 
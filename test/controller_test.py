@@ -88,6 +88,8 @@ def main():
 
         @consumer(GlobalSignals.SEND_DATA)
         def handle_data_received(data):
+            if isinstance(data, bytes):
+                data = data.decode('utf-8')
             print("[SENT]" + data)
 
         
@@ -0,0 +1,179 @@
+import threading
+
+import pytest
+
+from pygcs.event_bus import Broadcastable, consumer, events
+from pygcs.signals import GlobalSignals
+from pygcs.controller import CommandTracker, GRBLController, GRBLInfo
+
+
+class FakeSerial(Broadcastable):
+    """Records SEND_DATA payloads, optionally blocking like a stuck serial write"""
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+        self.received = threading.Condition()
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    @consumer(GlobalSignals.SEND_DATA)
+    def write(self, data):
+        self.unblocked.wait()
+        with self.received:
+            self.writes.append(data)
+            self.received.notify_all()
+
+    def wait_for_writes(self, count, timeout=2):
+        with self.received:
+            assert self.received.wait_for(lambda: len(self.writes) >= count, timeout)
+        return self.writes[:count]
+
+
+@pytest.fixture
+def serial():
+    # Registered as an instance, so unregistering it removes its consumer
+    s = FakeSerial()
+    yield s
+    s.unblocked.set()
+    events.unregister_instance(s)
+
+
+@pytest.fixture
+def controller(serial):
+    c = GRBLController()
+    yield c
+    serial.unblocked.set()
+    c.shutdown()
+    events.unregister_instance(c)
+    events.unregister_instance(c._info)
+
+
+@pytest.fixture
+def info():
+    i = GRBLInfo()
+    yield i
+    events.unregister_instance(i)
+
+
+def test_rx_bytes_are_released_by_ok_and_error(controller):
+    first = controller.queue_command('G1 X1')
+    second = controller.queue_command('G1 X22')
+    controller._send_planned()
+
+    assert controller._rx_in_flight == len(b'G1 X1\n') + len(b'G1 X22\n')
+
+    controller.receive_message('ok')
+    assert first.completed
+    assert controller._rx_in_flight == len(b'G1 X22\n')
+
+    controller.receive_message('error:20')
+    assert second.errored and second.error_message == 20
+    assert controller._rx_in_flight == 0
+    assert not controller.command_queue
+
+
+
+def test_unsolicited_error_is_ignored(controller):
+    controller.receive_message('error:9')
+
+    assert controller._rx_in_flight == 0
+    assert not controller.command_queue
+
+def test_send_planned_batches_into_one_write(controller, serial):
+    for i in range(3):
+        controller.queue_command(f'G1 X{i}')
+    controller._send_planned()
+
+    assert serial.wait_for_writes(1) == [b'G1 X0\nG1 X1\nG1 X2\n']
+    assert len(controller.command_queue) == 3
+    assert not controller.planner_queue
+
+
+def test_send_planned_stops_at_rx_buffer_size(controller, serial):
+    # 64 bytes per line with the newline, so two fill the 128 byte buffer
+    line = 'G1 X' + '1' * 59
+    trackers = [controller.queue_command(line) for _ in range(3)]
+    controller._send_planned()
+
+    assert controller._rx_in_flight == 128
+    assert [t.is_submitted for t in trackers] == [True, True, False]
+
+    controller.receive_message('ok')
+    controller._send_planned()
+    assert trackers[2].is_submitted
+    assert controller._rx_in_flight == 128
+    assert serial.wait_for_writes(2)[1] == (line + '\n').encode()
+
+
+def test_send_planned_resolves_each_command_once(controller, serial):
+    info = controller._info
+    resolved = []
+    get_var = info.get_var
+    info.get_var = lambda name: resolved.append(name) or get_var(name)
+    controller.queue_command('G0 X[posx] (µ)', tracker=CommandTracker(info, 'G0 X[posx] (µ)'))
+    controller._send_planned()
+
+    assert resolved == ['posx']
+    # Counted in encoded bytes, the same bytes that were written
+    assert controller._rx_in_flight == len(serial.wait_for_writes(1)[0])
+
+
+def test_send_planned_stops_at_max_command_queue_size(controller):
+    controller.max_command_queue_size = 2
+    for i in range(4):
+        controller.queue_command(f'G1 X{i}')
+    controller._send_planned()
+
+    assert len(controller.command_queue) == 2
+    assert len(controller.planner_queue) == 2
+
+
+def test_writer_keeps_send_order(controller, serial):
+    trackers = [controller.queue_command(f'G1 X{i}', immediate=True) for i in range(20)]
+
+    writes = serial.wait_for_writes(20)
+    assert writes == [f'G1 X{i}\n'.encode() for i in range(20)]
+    assert list(controller.command_queue) == trackers
+
+
+def test_stalled_writer_does_not_hold_the_lock(controller, serial):
+    serial.unblocked.clear()
+
+    def send_many():
+        for i in range(200):
+            controller.queue_command(f'G1 X{i}', immediate=True)
+
+    sender = threading.Thread(target=send_many, daemon=True)
+    sender.start()
+    sender.join(timeout=2)
+    assert not sender.is_alive()
+
+    assert controller.lock.acquire(timeout=1)
+    controller.lock.release()
+
+    serial.unblocked.set()
+    assert len(serial.wait_for_writes(200)) == 200
+
+
+def test_shutdown_stops_writer_and_rejects_sends(controller, serial):
+    controller.queue_command('G1 X1', immediate=True)
+    serial.wait_for_writes(1)
+    writer = controller._writer_thread
+
+    controller.shutdown()
+    writer.join(timeout=2)
+    assert not writer.is_alive()
+
+    tracker = controller.queue_command('G1 X2', immediate=True)
+    assert tracker.errored
+    assert controller._writer_thread is None
+
+
+def test_status_report_updates_state_and_position(info):
+    info.receive_message('<Run|MPos:1.000,2.000,3.000|FS:0,0|Pn:XZ>')
+
+    assert info.state == 'Run'
+    assert list(info.position) == [1.0, 2.0, 3.0]
+    assert info.data['FS'] == [0.0, 0.0]
+    assert info.data['Pn'] == 'XZ'
+    assert info.status_count == 1
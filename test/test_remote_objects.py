@@ -0,0 +1,93 @@
+from concurrent.futures import Future
+
+import pytest
+
+from pygcs.remote_objects import (
+    RemoteObject, RemoteObjectGet, RemoteObjectGetMany, RemoteObjectServer
+)
+
+
+class Machine:
+    def __init__(self):
+        self.position = [1.0, 2.0, 3.0]
+        self.state = 'Idle'
+        self.secret = 'hidden'
+        self._private = 'hidden'
+
+    def home(self):
+        pass
+
+
+@pytest.fixture
+def server():
+    s = RemoteObjectServer()
+    s.add_allowed_class(Machine)
+    s.add_allowed_attributes('Machine', ['position', 'state'])
+    yield s
+    s.executer.shutdown(wait=False)
+
+
+def get_many(server, obj_id, names):
+    remote_call = RemoteObjectGetMany(obj_id=obj_id, attr_names=names).to_remote_call()
+    return server.handle_remote_object_get_many(remote_call)
+
+
+def test_get_many_returns_every_requested_attribute(server):
+    obj_id = server.register_object(Machine())
+
+    assert get_many(server, obj_id, ['position', 'state']) == {
+        'position': [1.0, 2.0, 3.0], 'state': 'Idle'
+    }
+
+
+@pytest.mark.parametrize('name', ['secret', '_private', '__class__'])
+def test_get_many_denies_disallowed_attributes(server, name):
+    obj_id = server.register_object(Machine())
+
+    with pytest.raises(ValueError, match='not allowed'):
+        get_many(server, obj_id, ['state', name])
+
+
+def test_get_many_honours_later_blocking(server):
+    obj_id = server.register_object(Machine())
+    get_many(server, obj_id, ['state'])
+
+    server.add_blocked_attributes('state')
+    with pytest.raises(ValueError, match='not allowed'):
+        get_many(server, obj_id, ['state'])
+
+
+class FakeClient:
+    """Answers remote gets from a dict and counts the round-trips"""
+    def __init__(self, values):
+        self.values = values
+        self.requests = 0
+
+    def send_remote_call(self, remote_call):
+        self.requests += 1
+        future = Future()
+        if isinstance(remote_call, RemoteObjectGetMany):
+            future.set_result({name: self.values[name] for name in remote_call.attr_names})
+        elif isinstance(remote_call, RemoteObjectGet):
+            future.set_result(self.values[remote_call.attr_name])
+        return future
+
+    def remove_remote_object(self, obj_id):
+        pass
+
+
+def test_cached_properties_are_copied():
+    client = FakeClient({'position': [1.0, 2.0, 3.0], 'data': {'Bf': [15, 128]}})
+    proxy = RemoteObject('1', client, original_class=Machine)
+    proxy._prop_ttl = 60
+
+    proxy.position.append(4.0)
+    proxy.position[0] = 0.0
+    assert proxy.position == [1.0, 2.0, 3.0]
+
+    prefetched = proxy._prefetch('data')
+    prefetched['data']['Bf'].append(0)
+    assert proxy.data == {'Bf': [15, 128]}
+
+    # One get for position and one prefetch, everything else from the cache
+    assert client.requests == 2